@@ -5,9 +5,13 @@
     "author": "Wan + ChatGPT",
     "license": "LGPL-3",
     "category": "Inventory/Logistics",
-    "depends": ["base", "stock", "delivery"],
+    "depends": ["base", "stock", "delivery", "sale_stock"],
     "data": [
-        "views/stock_picking_views.xml"
+        "security/ir.model.access.csv",
+        "data/ir_cron.xml",
+        "views/stock_picking_views.xml",
+        "views/sale_order_views.xml",
+        "views/gdex_consignment_outbox_views.xml"
     ],
     "installable": True,
     "application": False,
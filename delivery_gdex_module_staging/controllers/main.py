@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+import json
+import logging
+
+from werkzeug.wsgi import wrap_file
+
+from odoo import fields, http
+from odoo.http import content_disposition, request
+
+_logger = logging.getLogger(__name__)
+
+
+class GdexWebhook(http.Controller):
+
+    @http.route("/gdex/webhook/status", type="http", auth="public", methods=["POST"], csrf=False)
+    def gdex_status_webhook(self, **kwargs):
+        """Receive batched GDEX status callbacks.
+
+        The body is a JSON list of events (or ``{"events": [...]}``) and must
+        be signed with HMAC-SHA256 of the raw body using the
+        ``delivery_gdex.webhook_secret`` system parameter, sent hex-encoded in
+        the ``X-GDEX-Signature`` header.
+        """
+        body = request.httprequest.get_data()
+        secret = request.env["ir.config_parameter"].sudo().get_param("delivery_gdex.webhook_secret")
+        if not secret:
+            return request.make_json_response({"error": "webhook not configured"}, status=503)
+
+        signature = (request.httprequest.headers.get("X-GDEX-Signature") or "").strip().lower()
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            _logger.warning("GDEX webhook rejected: invalid signature from %s", request.httprequest.remote_addr)
+            return request.make_json_response({"error": "invalid signature"}, status=401)
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return request.make_json_response({"error": "invalid JSON"}, status=400)
+
+        events = data.get("events") if isinstance(data, dict) else data
+        if not isinstance(events, list):
+            return request.make_json_response({"error": "events must be a list"}, status=400)
+
+        result = request.env["stock.picking"].sudo()._gdex_process_status_events(events)
+        _logger.info("GDEX webhook processed %s", result)
+        return request.make_json_response(result)
+
+
+class GdexLabels(http.Controller):
+
+    @http.route("/gdex/labels/wave", type="http", auth="user", methods=["GET"])
+    def gdex_wave_labels(self, ids="", **kwargs):
+        """Stream the merged GDEX labels of a wave as one PDF.
+
+        The merged file is a temporary file served in chunks and deleted
+        when the response is closed; nothing is stored as an attachment.
+        """
+        picking_ids = [int(i) for i in ids.split(",") if i.isdigit()]
+        pickings = request.env["stock.picking"].browse(picking_ids).exists()
+        if not pickings:
+            raise request.not_found()
+        pickings.check_access("read")
+        labels = pickings._gdex_ensure_labels()
+        merged = pickings._gdex_merge_labels([labels[picking.id] for picking in pickings.sorted("name")])
+        size = merged.seek(0, 2)
+        merged.seek(0)
+        filename = "GDEX_Wave_%s.pdf" % fields.Datetime.now().strftime("%Y%m%d_%H%M%S")
+        response = request.make_response(
+            wrap_file(request.httprequest.environ, merged),
+            headers=[
+                ("Content-Type", "application/pdf"),
+                ("Content-Length", str(size)),
+                ("Content-Disposition", content_disposition(filename)),
+            ],
+        )
+        response.direct_passthrough = True
+        return response
@@ -1,2 +1,5 @@
+from . import gdex_consignment_outbox
+from . import gdex_metrics
 from . import res_config_settings
 from . import stock_picking
+from . import sale_order
@@ -0,0 +1,157 @@
+import logging
+from datetime import timedelta
+
+import psycopg2
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Namespace of the session-level advisory lock taken per picking while a
+# consignment is being created (pg_try_advisory_lock(namespace, picking_id))
+OUTBOX_LOCK_NAMESPACE = 4733
+# A row still in "sending" after this long belongs to a dispatcher that died
+SENDING_TIMEOUT = timedelta(minutes=15)
+
+
+class GdexConsignmentOutbox(models.Model):
+    _name = "gdex.consignment.outbox"
+    _description = "GDEX Consignment Outbox"
+    _order = "id desc"
+
+    picking_id = fields.Many2one(
+        "stock.picking",
+        string="Delivery Order",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    client_ref = fields.Char(
+        string="Client Reference",
+        required=True,
+        readonly=True,
+        copy=False,
+        help="Reference sent to GDEX with the consignment; identical on every retry.",
+    )
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("sending", "Sending"),
+            ("unknown", "Unknown (check GDEX)"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        default="pending",
+        required=True,
+        readonly=True,
+    )
+    cn = fields.Char(string="GDEX CN", copy=False)
+    attempts = fields.Integer(string="Attempts", readonly=True)
+    response = fields.Text(string="Last Response", readonly=True)
+    error = fields.Text(string="Last Error", readonly=True)
+
+    _sql_constraints = [
+        ("picking_uniq", "unique(picking_id)", "Only one GDEX outbox entry per delivery is allowed."),
+        ("client_ref_uniq", "unique(client_ref)", "GDEX client reference must be unique."),
+    ]
+
+    @api.model
+    def _ensure_for_picking(self, picking_id):
+        """Return the outbox entry of a picking, creating it if needed."""
+        outbox = self.search([("picking_id", "=", picking_id)])
+        if outbox:
+            return outbox
+        dbuuid = self.env["ir.config_parameter"].sudo().get_param("database.uuid") or ""
+        try:
+            with self.env.cr.savepoint():
+                return self.create({
+                    "picking_id": picking_id,
+                    "client_ref": "ODOO-%s-%s" % (dbuuid[:8].upper(), picking_id),
+                })
+        except psycopg2.errors.UniqueViolation:
+            # Created concurrently by another dispatcher
+            return self.search([("picking_id", "=", picking_id)])
+
+    @api.model
+    def _try_lock(self, cr, picking_id):
+        """Take the dispatch lock of a picking on ``cr``'s connection.
+
+        The lock is session level, so it survives commits on that cursor and
+        must be released with :meth:`_unlock` before the cursor is closed.
+        """
+        cr.execute("SELECT pg_try_advisory_lock(%s, %s)", [OUTBOX_LOCK_NAMESPACE, picking_id])
+        return cr.fetchone()[0]
+
+    @api.model
+    def _unlock(self, cr, picking_id):
+        cr.execute("SELECT pg_advisory_unlock(%s, %s)", [OUTBOX_LOCK_NAMESPACE, picking_id])
+
+    @api.model
+    def _flag_stale_sending(self):
+        """Move rows stuck in "sending" to "unknown" for a manual check.
+
+        Only rows older than SENDING_TIMEOUT whose dispatch lock is free are
+        touched; a live dispatcher still holds the lock. The interrupted call
+        may have reached GDEX, so they are never made retryable here.
+        """
+        stale = self.search([
+            ("state", "=", "sending"),
+            ("write_date", "<", fields.Datetime.now() - SENDING_TIMEOUT),
+        ])
+        flagged = self.browse()
+        for entry in stale:
+            if not self._try_lock(self.env.cr, entry.picking_id.id):
+                continue
+            try:
+                entry.write({
+                    "state": "unknown",
+                    "error": _(
+                        "Interrupted while sending. Check GDEX for a consignment with reference %s."
+                    ) % entry.client_ref,
+                })
+                flagged |= entry
+            finally:
+                self._unlock(self.env.cr, entry.picking_id.id)
+        if flagged:
+            _logger.warning("GDEX outbox: %s interrupted sends need a manual check", len(flagged))
+        return flagged
+
+    # ---------------------------------------------------------
+    # MANUAL RESOLUTION (outcome unknown)
+    # ---------------------------------------------------------
+    def action_confirm_cn(self):
+        """The consignment exists in GDEX: keep the CN entered on the row."""
+        for entry in self.filtered(lambda e: e.state == "unknown"):
+            if not entry.cn:
+                raise UserError(_("Enter the GDEX CN of %s first.") % entry.picking_id.name)
+            entry.write({"state": "done", "error": False})
+        self._cron_reconcile()
+        return True
+
+    def action_mark_not_created(self):
+        """GDEX has no consignment for this reference: allow a resend."""
+        self.filtered(lambda e: e.state == "unknown").write({"state": "failed", "cn": False})
+        return True
+
+    @api.model
+    def _cron_reconcile(self):
+        """Copy CNs obtained by earlier attempts onto pickings that lost them.
+
+        Also flags rows left in "sending" by a dispatcher that died.
+        """
+        self._flag_stale_sending()
+        entries = self.search([
+            ("state", "=", "done"),
+            ("cn", "!=", False),
+            ("picking_id.gdex_cn", "=", False),
+        ])
+        for entry in entries:
+            entry.picking_id.write({"gdex_cn": entry.cn})
+            entry.picking_id.message_post(
+                body=_("GDEX consignment recovered from outbox: %s") % entry.cn
+            )
+        if entries:
+            _logger.info("GDEX outbox reconciled %s deliveries", len(entries))
+        return True
@@ -0,0 +1,104 @@
+import bisect
+import collections
+import threading
+import time
+
+from odoo import _, api, models
+from odoo.exceptions import AccessError
+
+# Upper bounds (ms) of the latency histogram buckets, last bucket is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+THROUGHPUT_WINDOW_S = 60
+
+
+class GdexCallMetrics:
+    """In-process counters for GDEX API calls.
+
+    Each Odoo worker process keeps its own figures; they are reset when the
+    worker restarts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.endpoints = {}
+            self.recent = collections.deque(maxlen=10000)
+
+    def _endpoint(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = {
+                "calls": 0,
+                "success": 0,
+                "errors": collections.Counter(),
+                "latency_sum_ms": 0.0,
+                "latency_max_ms": 0.0,
+                "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        return stats
+
+    def record(self, endpoint, status, latency_ms):
+        """Record one call. ``status`` is the HTTP status or "network" on transport errors."""
+        now = time.time()
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats["calls"] += 1
+            if status == 200:
+                stats["success"] += 1
+            else:
+                stats["errors"][str(status)] += 1
+            stats["latency_sum_ms"] += latency_ms
+            stats["latency_max_ms"] = max(stats["latency_max_ms"], latency_ms)
+            stats["histogram"][bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            self.recent.append(now)
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            window_calls = sum(1 for ts in self.recent if ts >= now - THROUGHPUT_WINDOW_S)
+            labels = ["<=%sms" % b for b in LATENCY_BUCKETS_MS] + [">%sms" % LATENCY_BUCKETS_MS[-1]]
+            endpoints = {}
+            for name, stats in self.endpoints.items():
+                endpoints[name] = {
+                    "calls": stats["calls"],
+                    "success": stats["success"],
+                    "errors_by_status": dict(stats["errors"]),
+                    "latency_avg_ms": round(stats["latency_sum_ms"] / stats["calls"], 1) if stats["calls"] else 0.0,
+                    "latency_max_ms": round(stats["latency_max_ms"], 1),
+                    "latency_histogram": dict(zip(labels, stats["histogram"])),
+                }
+            return {
+                "since": self.started_at,
+                "uptime_s": round(now - self.started_at, 1),
+                "calls_last_minute": window_calls,
+                "throughput_per_s": round(window_calls / THROUGHPUT_WINDOW_S, 3),
+                "endpoints": endpoints,
+            }
+
+
+METRICS = GdexCallMetrics()
+
+
+class GdexMetrics(models.AbstractModel):
+    _name = "gdex.metrics"
+    _description = "GDEX API Call Metrics"
+
+    def _check_admin(self):
+        if not self.env.user.has_group("base.group_system"):
+            raise AccessError(_("Only administrators can read GDEX call metrics."))
+
+    @api.model
+    def get_metrics(self):
+        """Return call counters, latency histograms and throughput of this worker."""
+        self._check_admin()
+        return METRICS.snapshot()
+
+    @api.model
+    def reset_metrics(self):
+        self._check_admin()
+        METRICS.reset()
+        return True
@@ -0,0 +1,111 @@
+import bisect
+import csv
+import logging
+import os
+import threading
+from array import array
+
+_logger = logging.getLogger(__name__)
+
+POSTCODE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "my_postcodes.csv")
+
+MY_STATE_NAMES = {
+    "JHR": "Johor",
+    "KDH": "Kedah",
+    "KTN": "Kelantan",
+    "KUL": "Kuala Lumpur",
+    "LBN": "Labuan",
+    "MLK": "Melaka",
+    "NSN": "Negeri Sembilan",
+    "PHG": "Pahang",
+    "PJY": "Putrajaya",
+    "PLS": "Perlis",
+    "PNG": "Pulau Pinang",
+    "PRK": "Perak",
+    "SBH": "Sabah",
+    "SGR": "Selangor",
+    "SWK": "Sarawak",
+    "TRG": "Terengganu",
+}
+
+# Other spellings seen on partner states, lower-cased
+MY_STATE_ALIASES = {
+    "KUL": ("wilayah persekutuan kuala lumpur", "w.p. kuala lumpur"),
+    "LBN": ("wilayah persekutuan labuan", "w.p. labuan"),
+    "MLK": ("malacca",),
+    "PJY": ("wilayah persekutuan putrajaya", "w.p. putrajaya"),
+    "PNG": ("penang",),
+}
+
+
+def state_matches(state_code, state_name, index_code):
+    """Tell whether a partner state (code/name) is the state of ``index_code``."""
+    if (state_code or "").strip().upper() == index_code:
+        return True
+    name = (state_name or "").strip().lower()
+    return name == MY_STATE_NAMES.get(index_code, "").lower() or name in MY_STATE_ALIASES.get(index_code, ())
+
+
+class PostcodeIndex:
+    """Sorted, non-overlapping postcode ranges held in flat arrays.
+
+    Each row of the data file is ``postcode_from,postcode_to,state_code``;
+    the bundled file only has state-level ranges, so there is no city data.
+    Lookups are a binary search over the range starts.
+    """
+
+    def __init__(self, path):
+        self.starts = array("I")
+        self.ends = array("I")
+        self.state_idx = array("B")
+        self.states = []
+        state_pos = {}
+
+        rows = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                rows.append((
+                    int(row["postcode_from"]),
+                    int(row["postcode_to"] or row["postcode_from"]),
+                    row["state_code"].strip().upper(),
+                ))
+        rows.sort()
+        for start, end, state in rows:
+            if self.ends and start <= self.ends[-1]:
+                _logger.warning("Overlapping postcode range %05d-%05d ignored", start, end)
+                continue
+            if state not in state_pos:
+                state_pos[state] = len(self.states)
+                self.states.append(state)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.state_idx.append(state_pos[state])
+
+    def lookup(self, postcode):
+        """Return the state code of a postcode, or None if unknown."""
+        code = (postcode or "").strip()
+        if len(code) != 5 or not code.isdigit():
+            return None
+        value = int(code)
+        pos = bisect.bisect_right(self.starts, value) - 1
+        if pos < 0 or value > self.ends[pos]:
+            return None
+        return self.states[self.state_idx[pos]]
+
+    def __len__(self):
+        return len(self.starts)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_postcode_index():
+    """Load the bundled postcode file on first use and keep it for the process."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PostcodeIndex(POSTCODE_FILE)
+                _logger.info("Loaded %s GDEX postcode ranges", len(_index))
+    return _index
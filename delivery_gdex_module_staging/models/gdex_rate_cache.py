@@ -0,0 +1,61 @@
+import collections
+import threading
+import time
+
+
+class GdexRateCache:
+    """Size-bounded LRU of GDEX rate quotes with a time-to-live.
+
+    Keys are ``(dbname, origin_zip, dest_zip, weight_bucket)``. The cache is
+    per worker process and shared by all requests it serves.
+    """
+
+    def __init__(self, max_size=5000, ttl=6 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._warmed = set()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            amount, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return amount
+
+    def put(self, key, amount, ttl=None):
+        with self._lock:
+            self._entries[key] = (amount, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self, dbname=None):
+        with self._lock:
+            if dbname is None:
+                self._entries.clear()
+                self._warmed.clear()
+                return
+            for key in [k for k in self._entries if k[0] == dbname]:
+                del self._entries[key]
+            self._warmed.discard(dbname)
+
+    def needs_warmup(self, dbname):
+        """Return True once per database, the first time it is asked."""
+        with self._lock:
+            if dbname in self._warmed:
+                return False
+            self._warmed.add(dbname)
+            return True
+
+    def __len__(self):
+        return len(self._entries)
+
+
+RATE_CACHE = GdexRateCache()
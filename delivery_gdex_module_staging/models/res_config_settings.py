@@ -24,3 +24,14 @@ class ResConfigSettings(models.TransientModel):
         config_parameter="delivery_gdex.subscription_key",
         help="Ocp-Apim-Subscription-Key from GDEX API portal (Testing / Live).",
     )
+    gdex_debug_payload = fields.Boolean(
+        string="Log Full GDEX Payloads",
+        config_parameter="delivery_gdex.debug_payload",
+        help="Debug only: log complete request payloads (contains customer data).",
+    )
+    gdex_webhook_secret = fields.Char(
+        string="GDEX Webhook Secret",
+        config_parameter="delivery_gdex.webhook_secret",
+        help="Shared secret used to verify the HMAC signature of GDEX status callbacks "
+             "sent to /gdex/webhook/status.",
+    )
@@ -0,0 +1,27 @@
+from odoo import _, fields, models
+from odoo.exceptions import UserError
+
+
+class SaleOrder(models.Model):
+    _inherit = "sale.order"
+
+    gdex_rate_amount = fields.Monetary(
+        string="GDEX Rate",
+        currency_field="currency_id",
+        copy=False,
+        readonly=True,
+        help="Shipping rate quoted by GDEX for the estimated order weight.",
+    )
+
+    def action_gdex_get_rate(self):
+        """Quote the GDEX shipping cost for the estimated weight of the order."""
+        Picking = self.env["stock.picking"]
+        for order in self:
+            dest = (order.partner_shipping_id.zip or "").strip()
+            origin = (order.warehouse_id.partner_id.zip or order.company_id.zip or "").strip()
+            if not (dest and origin):
+                raise UserError(_(
+                    "%s: both the warehouse/company and the delivery address need a Postcode (ZIP) for a GDEX rate."
+                ) % order.name)
+            order.gdex_rate_amount = Picking._gdex_get_rate(origin, dest, order._get_estimated_weight())
+        return True
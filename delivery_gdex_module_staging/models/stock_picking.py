@@ -1,17 +1,153 @@
+import base64
+import io
 import json
 import logging
+import math
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import pytz
 import requests
 
-from odoo import _, fields, models
+from odoo import _, api, fields, models
 from odoo.exceptions import UserError
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+from .gdex_metrics import METRICS
+from .gdex_postcode_index import MY_STATE_NAMES, get_postcode_index, state_matches
+from .gdex_rate_cache import RATE_CACHE
 
 _logger = logging.getLogger(__name__)
 
+# Carrier status text (lower-cased) -> normalised gdex_state
+GDEX_STATUS_MAP = {
+    "pending": "pending",
+    "pending pickup": "pending",
+    "picked up": "picked_up",
+    "pickup": "picked_up",
+    "in transit": "in_transit",
+    "transit": "in_transit",
+    "out for delivery": "out_for_delivery",
+    "delivered": "delivered",
+    "returned": "returned",
+    "return to shipper": "returned",
+    "cancelled": "cancelled",
+    "canceled": "cancelled",
+}
+GDEX_TERMINAL_STATES = ("delivered", "returned", "cancelled")
+# GDEX sends event timestamps in Malaysian local time
+GDEX_TIMEZONE = pytz.timezone("Asia/Kuala_Lumpur")
+
+
+class GdexConnectionError(UserError):
+    """GDEX is unreachable, down or rejects our credentials.
+
+    Unlike other GDEX errors it does not depend on the data sent, so batch
+    jobs stop instead of moving on to the next batch.
+    """
+
+
+class GdexOutcomeUnknown(GdexConnectionError):
+    """The request may or may not have been processed by GDEX.
+
+    Raised on transport errors, timeouts, 5xx and unreadable responses.
+    A consignment request failing this way must not be resent blindly.
+    """
+
+
+class LazyLabelStream(io.RawIOBase):
+    """Seekable stream over a label that opens its file only when accessed.
+
+    Streams built with the same ``shared`` dict keep at most one underlying
+    file open: opening one closes the previous one, remembering its position
+    so it can be reopened transparently later.
+    """
+
+    def __init__(self, opener, shared):
+        super().__init__()
+        self._opener = opener
+        self._shared = shared
+        self._file = None
+        self._pos = 0
+
+    def _handle(self):
+        if self._file is None:
+            previous = self._shared.get("open")
+            if previous is not None:
+                previous._release()
+            self._file = self._opener()
+            self._file.seek(self._pos)
+            self._shared["open"] = self
+        return self._file
+
+    def _release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._shared.get("open") is self:
+            del self._shared["open"]
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._handle().read(len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._pos = self._handle().seek(offset, whence)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._release()
+        super().close()
+
 
 class StockPicking(models.Model):
     _inherit = "stock.picking"
 
-    gdex_cn = fields.Char(string="GDEX CN", copy=False, readonly=True)
+    gdex_cn = fields.Char(string="GDEX CN", copy=False, readonly=True, index="btree_not_null")
+    gdex_state = fields.Selection(
+        [
+            ("pending", "Pending Pickup"),
+            ("picked_up", "Picked Up"),
+            ("in_transit", "In Transit"),
+            ("out_for_delivery", "Out for Delivery"),
+            ("delivered", "Delivered"),
+            ("returned", "Returned"),
+            ("cancelled", "Cancelled"),
+            ("exception", "Exception"),
+        ],
+        string="GDEX Status",
+        copy=False,
+        readonly=True,
+    )
+    gdex_status = fields.Char(string="GDEX Status Text", copy=False, readonly=True)
+    gdex_status_date = fields.Datetime(string="GDEX Status Date", copy=False, readonly=True)
+    gdex_rate_amount = fields.Float(
+        string="GDEX Rate",
+        digits="Product Price",
+        copy=False,
+        readonly=True,
+        help="Last shipping rate quoted by GDEX for this delivery.",
+    )
+    gdex_rate_date = fields.Datetime(string="GDEX Rate Date", copy=False, readonly=True)
+    gdex_last_sync = fields.Datetime(
+        string="GDEX Last Sync",
+        copy=False,
+        readonly=True,
+        help="Last time the tracking status was pulled from GDEX (sync watermark).",
+    )
 
     def _gdex_get_base_url(self):
         """Return sandbox or production base URL based on config."""
@@ -28,25 +164,161 @@ class StockPicking(models.Model):
         acct = ICP.get_param("delivery_gdex.account_no") or ""
         sub_key = ICP.get_param("delivery_gdex.subscription_key") or ""
         if not token or not acct or not sub_key:
-            raise UserError(_(
+            raise GdexConnectionError(_(
                 "Please configure GDEX API Token, Account No. and Subscription Key "
                 "in System Parameters (delivery_gdex.api_token, "
                 "delivery_gdex.account_no, delivery_gdex.subscription_key)."
             ))
         return token, acct, sub_key
 
+    def _gdex_get_headers(self, token, sub_key):
+        return {
+            "ApiToken": token,
+            "Content-Type": "application/json",
+            "Ocp-Apim-Subscription-Key": sub_key,
+        }
+
+    def _gdex_post(self, endpoint, payload, with_account=False, timeout=30):
+        """POST ``payload`` to a GDEX endpoint and return the decoded JSON.
+
+        Every call is timed and recorded in the in-process metrics. Only a
+        compact line is logged; full payloads are logged when the
+        ``delivery_gdex.debug_payload`` system parameter is enabled.
+        """
+        token, account_no, sub_key = self._gdex_get_credentials()
+        url = f"{self._gdex_get_base_url()}/{endpoint}"
+        if with_account:
+            url = f"{url}?accountNo={account_no}"
+
+        ICP = self.env["ir.config_parameter"].sudo()
+        if ICP.get_param("delivery_gdex.debug_payload", "False") in ("1", "True", "true"):
+            _logger.info("GDEX POST %s payload=%s", url, payload)
+
+        start = time.monotonic()
+        try:
+            resp = requests.post(
+                url,
+                headers=self._gdex_get_headers(token, sub_key),
+                data=json.dumps(payload),
+                timeout=timeout,
+            )
+        except Exception as e:
+            latency_ms = (time.monotonic() - start) * 1000
+            METRICS.record(endpoint, "network", latency_ms)
+            _logger.warning(
+                "GDEX %s pickings=%s status=network latency=%.0fms error=%s",
+                endpoint, self.ids, latency_ms, e,
+            )
+            raise GdexOutcomeUnknown(_("Failed to contact GDEX: %s") % e)
+
+        latency_ms = (time.monotonic() - start) * 1000
+        METRICS.record(endpoint, resp.status_code, latency_ms)
+        _logger.info(
+            "GDEX %s pickings=%s status=%s latency=%.0fms",
+            endpoint, self.ids, resp.status_code, latency_ms,
+        )
+
+        if resp.status_code >= 500:
+            raise GdexOutcomeUnknown(_("GDEX returned HTTP %s: %s") % (resp.status_code, resp.text))
+        if resp.status_code in (401, 403):
+            raise GdexConnectionError(_("GDEX returned HTTP %s: %s") % (resp.status_code, resp.text))
+        if resp.status_code != 200:
+            raise UserError(_("GDEX returned HTTP %s: %s") % (resp.status_code, resp.text))
+
+        try:
+            return resp.json()
+        except Exception:
+            raise GdexOutcomeUnknown(_("GDEX response is not JSON: %s") % resp.text)
+
+    def _gdex_receiver_errors(self):
+        """Return the list of receiver problems that would make GDEX reject this picking."""
+        return self._gdex_check_receiver()[0]
+
+    def _gdex_receiver_warnings(self):
+        """Return receiver data that looks doubtful but does not block sending."""
+        return self._gdex_check_receiver()[1]
+
+    def _gdex_check_receiver(self):
+        """Return ``(errors, warnings)`` for the delivery address.
+
+        Only an unknown postcode is an error. The bundled index holds
+        state-level ranges only, and border areas (e.g. 34950 Bandar Baharu,
+        Kedah, inside the Perak range) fall in a neighbour's range, so a state
+        mismatch is a warning. The city is not checked: there is no city data.
+        """
+        self.ensure_one()
+        partner = self.partner_id
+        errors = []
+        warnings = []
+        if not partner:
+            return [_("Delivery address is missing.")], warnings
+        # Require mobile number (your system uses mobile)
+        if not partner.mobile:
+            errors.append(_("Receiver mobile number is required for GDEX. Please fill Customer Mobile."))
+        if not (partner.zip and partner.city):
+            errors.append(_("Receiver must have City and Postcode (ZIP)."))
+        elif (partner.country_id.code or "MY") == "MY":
+            state_code = get_postcode_index().lookup(partner.zip)
+            if not state_code:
+                errors.append(_("Postcode %s is not a valid Malaysian postcode.") % partner.zip)
+                return errors, warnings
+            if partner.state_id and not state_matches(partner.state_id.code, partner.state_id.name, state_code):
+                warnings.append(_(
+                    "Postcode %(zip)s belongs to %(expected)s, not %(state)s.",
+                    zip=partner.zip,
+                    expected=MY_STATE_NAMES.get(state_code, state_code),
+                    state=partner.state_id.name,
+                ))
+        return errors, warnings
+
+    def _gdex_validate_for_create(self):
+        """Check the whole selection before any consignment is sent.
+
+        Partner, state and country data are loaded for all pickings in a few
+        batched reads, and every invalid picking is reported in one error.
+
+        :return: the pickings ready to be sent, in selection order
+        """
+        self.fetch(["name", "gdex_cn", "partner_id", "picking_type_id", "company_id"])
+        self.picking_type_id.fetch(["code"])
+        partners = self.partner_id
+        partners.fetch([
+            "name", "mobile", "email", "street", "street2",
+            "city", "zip", "state_id", "country_id",
+        ])
+        partners.state_id.fetch(["name", "code"])
+        partners.country_id.fetch(["code"])
+        self.company_id.fetch(["name"])
+
+        errors = []
+        for picking in self:
+            problems = []
+            if picking.picking_type_code != "outgoing":
+                problems.append(_("GDEX consignment can only be created for outgoing deliveries."))
+            if picking.gdex_cn:
+                problems.append(_("A GDEX consignment already exists for this delivery: %s") % picking.gdex_cn)
+            problems += picking._gdex_receiver_errors()
+            if problems:
+                errors.append("%s: %s" % (picking.name, " ".join(problems)))
+
+        if errors:
+            raise UserError(_(
+                "%(count)s of %(total)s deliveries cannot be sent to GDEX:\n%(errors)s",
+                count=len(errors),
+                total=len(self),
+                errors="\n".join(errors),
+            ))
+        return self
+
     def _gdex_build_payload_for_receivers(self):
         """Build minimal payload from the picking to the GDEX 'ShipmentReceiversArray'."""
         self.ensure_one()
         partner = self.partner_id  # delivery address
 
-        # Require mobile number (your system uses mobile)
+        errors = self._gdex_receiver_errors()
+        if errors:
+            raise UserError("\n".join(errors))
         phone = partner.mobile
-        if not phone:
-            raise UserError(_("Receiver mobile number is required for GDEX. Please fill Customer Mobile."))
-
-        if not (partner.zip and partner.city):
-            raise UserError(_("Receiver must have City and Postcode (ZIP)."))
 
         # Weight: use picking.weight, fallback to 1kg
         weight = self.weight or 1.0
@@ -65,6 +337,12 @@ class StockPicking(models.Model):
         postcode = partner.zip or ""
         state = partner.state_id and partner.state_id.name or ""
         country = partner.country_id and partner.country_id.code or "MY"
+        city = partner.city or ""
+        if country == "MY":
+            # Fill a missing state from the postcode index
+            state_code = get_postcode_index().lookup(postcode)
+            if state_code:
+                state = state or MY_STATE_NAMES.get(state_code, "")
 
         shipment = {
             "shipmentType": "Parcel",
@@ -84,7 +362,7 @@ class StockPicking(models.Model):
             "receiverAddress2": addr2[:50],
             "receiverAddress3": addr3[:50],
             "receiverPostcode": postcode,
-            "receiverCity": partner.city or "",
+            "receiverCity": city,
             "receiverState": state,
             "receiverCountry": country,
         }
@@ -92,59 +370,533 @@ class StockPicking(models.Model):
 
     def action_gdex_create(self):
         """Create consignment on GDEX and save CN back to picking."""
-        for picking in self:
-            if picking.picking_type_code != "outgoing":
-                raise UserError(_("GDEX consignment can only be created for outgoing deliveries."))
+        # Validate and build every payload before the first network call
+        to_send = [
+            (picking, picking._gdex_build_payload_for_receivers())
+            for picking in self._gdex_validate_for_create()
+        ]
+        for picking, receivers in to_send:
+            cn = picking._gdex_dispatch_consignment(receivers)
+            _logger.info("GDEX consignment created picking=%s cn=%s", picking.id, cn)
+            picking.write({"gdex_cn": cn})
+            body = _("GDEX consignment created: %s") % cn
+            warnings = picking._gdex_receiver_warnings()
+            if warnings:
+                body = "%s. %s" % (body, _("Please check the address: %s") % " ".join(warnings))
+            picking.message_post(body=body)
+        return True
 
-            if picking.gdex_cn:
-                raise UserError(_("A GDEX consignment already exists for this delivery: %s") % picking.gdex_cn)
+    @api.model
+    def _gdex_extract_cn(self, data):
+        cn = None
+        if isinstance(data, dict):
+            # Adapt these keys once you see the real GDEX response for your account
+            if "data" in data and isinstance(data["data"], list) and data["data"]:
+                first = data["data"][0]
+                cn = first.get("cn") or first.get("CN") or first.get("cnNo") or first.get("consignmentNo")
+            if not cn:
+                cn = (
+                    data.get("cn")
+                    or data.get("CN")
+                    or data.get("cnNo")
+                    or data.get("consignmentNo")
+                )
+        return cn
 
-            token, account_no, sub_key = picking._gdex_get_credentials()
-            base = picking._gdex_get_base_url()
-            url = f"{base}/CreateConsignment?accountNo={account_no}"
+    def _gdex_dispatch_consignment(self, receivers):
+        """Create the consignment through the outbox and return its CN.
 
-            headers = {
-                "ApiToken": token,
-                "Content-Type": "application/json",
-                "Ocp-Apim-Subscription-Key": sub_key,
-            }
-            payload = {
-                "ShipmentReceiversArray": picking._gdex_build_payload_for_receivers()
-            }
+        The outbox row is committed before GDEX is called and the response is
+        stored on it in its own transaction, so a CN survives a rollback of
+        the picking transaction. A retry then reuses that CN instead of
+        creating a second consignment.
 
-            _logger.info("GDEX POST %s payload=%s", url, payload)
-            try:
-                resp = requests.post(url, headers=headers, data=json.dumps(payload), timeout=30)
-            except Exception as e:
-                _logger.exception("GDEX call failed")
-                raise UserError(_("Failed to contact GDEX: %s") % e)
+        A session-level advisory lock on the picking is held on a dedicated
+        connection for the whole call (it survives the intermediate commits),
+        so parallel dispatchers fail fast.
 
-            if resp.status_code != 200:
-                raise UserError(_("GDEX returned HTTP %s: %s") % (resp.status_code, resp.text))
+        Only a definitive rejection (HTTP 4xx) marks the row "failed" and
+        allows a resend. Ambiguous outcomes (network error, timeout, 5xx,
+        unreadable or CN-less 200 response) leave it "unknown", and rows in
+        "sending" or "unknown" are never resent: GDEX may already hold the
+        consignment, so a stock manager has to check and resolve the row
+        from the outbox first.
+        """
+        self.ensure_one()
+        with self.env.registry.cursor() as cr:
+            self.env(cr=cr, su=True)["gdex.consignment.outbox"]._ensure_for_picking(self.id)
 
+        with self.env.registry.cursor() as cr:
+            env = self.env(cr=cr, su=True)
+            Outbox = env["gdex.consignment.outbox"]
+            if not Outbox._try_lock(cr, self.id):
+                raise UserError(_(
+                    "A GDEX consignment for %s is already being created by another user or job."
+                ) % self.name)
             try:
-                data = resp.json()
-            except Exception:
-                raise UserError(_("GDEX response is not JSON: %s") % resp.text)
-
-            cn = None
-            if isinstance(data, dict):
-                # Adapt these keys once you see the real GDEX response for your account
-                if "data" in data and isinstance(data["data"], list) and data["data"]:
-                    first = data["data"][0]
-                    cn = first.get("cn") or first.get("CN") or first.get("cnNo") or first.get("consignmentNo")
-                if not cn:
-                    cn = (
-                        data.get("cn")
-                        or data.get("CN")
-                        or data.get("cnNo")
-                        or data.get("consignmentNo")
-                    )
+                cn, data = self._gdex_dispatch_locked(env, receivers)
+            finally:
+                cr.rollback()
+                Outbox._unlock(cr, self.id)
+
+        if not cn:
+            _logger.warning("Unexpected GDEX response for picking %s: %s", self.id, data)
+            raise UserError(_(
+                "Could not find CN in GDEX response for %s. The consignment may still have been "
+                "created; please check it in GDEX and resolve the entry in the GDEX Outbox."
+            ) % self.name)
+        return cn
 
+    def _gdex_dispatch_locked(self, env, receivers):
+        """Send the consignment while the dispatch lock is held; return (cn, data)."""
+        cr = env.cr
+        outbox = env["gdex.consignment.outbox"].search([("picking_id", "=", self.id)])
+        if outbox.cn:
+            _logger.info("GDEX consignment reused from outbox picking=%s cn=%s", self.id, outbox.cn)
+            return outbox.cn, None
+        if outbox.state in ("sending", "unknown"):
+            raise UserError(_(
+                "The previous GDEX request for %s may have created a consignment. "
+                "Please check it in GDEX and resolve the entry in the GDEX Outbox before retrying."
+            ) % self.name)
+
+        payload = {
+            "ShipmentReceiversArray": [
+                dict(receiver, orderID=outbox.client_ref) for receiver in receivers
+            ]
+        }
+        outbox.write({"state": "sending", "attempts": outbox.attempts + 1})
+        cr.commit()
+        try:
+            data = self.with_env(env)._gdex_post("CreateConsignment", payload, with_account=True)
+        except GdexOutcomeUnknown as e:
+            outbox.write({"state": "unknown", "error": str(e)})
+            cr.commit()
+            raise UserError(_(
+                "%(error)s\nThe consignment for %(picking)s may still have been created; please check it "
+                "in GDEX and resolve the entry in the GDEX Outbox.",
+                error=str(e),
+                picking=self.name,
+            ))
+        except UserError as e:
+            outbox.write({"state": "failed", "error": str(e)})
+            cr.commit()
+            raise
+
+        cn = self._gdex_extract_cn(data)
+        outbox.write({
+            "state": "done" if cn else "unknown",
+            "cn": cn or False,
+            "response": json.dumps(data),
+            "error": False if cn else _("Could not find CN in GDEX response."),
+        })
+        cr.commit()
+        return cn, data
+
+    # ---------------------------------------------------------
+    # TRACKING STATUS SYNC
+    # ---------------------------------------------------------
+    @api.model
+    def _gdex_map_status(self, status_text):
+        """Map GDEX status text to a gdex_state value."""
+        text = (status_text or "").strip().lower()
+        if not text:
+            return False
+        if text in GDEX_STATUS_MAP:
+            return GDEX_STATUS_MAP[text]
+        for key, state in GDEX_STATUS_MAP.items():
+            if key in text:
+                return state
+        return "exception"
+
+    @api.model
+    def _gdex_fetch_last_status(self, cns):
+        """Return {cn: (status_text, status_date)} for a list of CNs (one API call)."""
+        data = self._gdex_post("GetLastShipmentStatus", list(cns), timeout=60)
+        rows = data.get("data") if isinstance(data, dict) else data
+        result = {}
+        for row in rows or []:
+            if not isinstance(row, dict):
+                continue
+            cn = row.get("cnNo") or row.get("cn") or row.get("CN") or row.get("consignmentNo")
             if not cn:
-                _logger.warning("Unexpected GDEX response: %s", data)
-                raise UserError(_("Could not find CN in GDEX response. Please check logs."))
+                continue
+            status = row.get("latestStatus") or row.get("status") or row.get("lastStatus") or ""
+            date = row.get("latestScanDateTime") or row.get("statusDate") or row.get("dateTime")
+            result[cn] = (status, date)
+        return result
 
-            picking.write({"gdex_cn": cn})
-            picking.message_post(body=_("GDEX consignment created: %s") % cn)
+    @api.model
+    def _gdex_parse_datetime(self, value):
+        """Parse a GDEX timestamp into a naive UTC datetime for Datetime fields.
+
+        Timestamps without an offset are Malaysian local time (GDEX_TIMEZONE).
+        """
+        if not value:
+            return False
+        text = str(value).strip()
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = fields.Datetime.to_datetime(text.replace("T", " ")[:19])
+            except ValueError:
+                return False
+        if parsed.tzinfo is None:
+            parsed = GDEX_TIMEZONE.localize(parsed)
+        return parsed.astimezone(pytz.utc).replace(tzinfo=None, microsecond=0)
+
+    def _gdex_apply_status_updates(self, updates):
+        """Write tracking updates back with one write per distinct status.
+
+        :param updates: {picking_id: (status_text, status_datetime)}
+        :return: recordset of pickings whose gdex_state changed
+        """
+        groups = {}
+        changed = self.browse()
+        for picking in self.browse(list(updates)):
+            status, status_date = updates[picking.id]
+            state = self._gdex_map_status(status)
+            if not state or (state == picking.gdex_state and status == picking.gdex_status):
+                continue
+            key = (state, status, status_date or False)
+            groups.setdefault(key, []).append(picking.id)
+            if state != picking.gdex_state:
+                changed |= picking
+
+        old_states = {p.id: p.gdex_state for p in changed}
+        for (state, status, status_date), ids in groups.items():
+            self.browse(ids).write({
+                "gdex_state": state,
+                "gdex_status": status,
+                "gdex_status_date": status_date,
+            })
+
+        state_labels = dict(self._fields["gdex_state"]._description_selection(self.env))
+        # webhook runs as the public user and sync as the cron user: post as OdooBot
+        author = self.env.ref("base.partner_root")
+        for picking in changed:
+            picking.message_post(
+                body=_("GDEX status: %(old)s → %(new)s") % {
+                    "old": state_labels.get(old_states[picking.id]) or _("None"),
+                    "new": state_labels.get(picking.gdex_state),
+                },
+                author_id=author.id,
+            )
+        return changed
+
+    @api.model
+    def _gdex_process_status_events(self, events):
+        """Apply a batch of GDEX status events (webhook payload).
+
+        Only the newest event per CN is kept, and events not newer than the
+        status already stored on the picking are dropped, so duplicates and
+        out-of-order deliveries are ignored.
+        """
+        latest = {}
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            cn = event.get("cnNo") or event.get("cn") or event.get("CN") or event.get("consignmentNo")
+            status = event.get("latestStatus") or event.get("status") or ""
+            if not (cn and status):
+                continue
+            date = self._gdex_parse_datetime(
+                event.get("latestScanDateTime") or event.get("statusDate") or event.get("dateTime")
+            )
+            current = latest.get(cn)
+            if current is None or (date and (not current[1] or date > current[1])):
+                latest[cn] = (status, date)
+
+        pickings = self.search([("gdex_cn", "in", list(latest))]) if latest else self.browse()
+        updates = {}
+        for picking in pickings:
+            status, date = latest[picking.gdex_cn]
+            if date and picking.gdex_status_date and date <= picking.gdex_status_date:
+                continue
+            updates[picking.id] = (status, date)
+        changed = pickings._gdex_apply_status_updates(updates)
+        return {
+            "received": len(events),
+            "matched": len(pickings),
+            "applied": len(updates),
+            "changed": len(changed),
+        }
+
+    @api.model
+    def _cron_gdex_sync_tracking(self, batch_size=100, limit=5000):
+        """Pull tracking status for open consignments, oldest-synced first.
+
+        Pickings in a terminal state are never queried again. Each batch is one
+        API call and is committed on its own. A batch GDEX rejects is still
+        stamped as synced so it moves to the back of the queue instead of
+        blocking every run; only connection or credential errors stop the run.
+        """
+        pickings = self.search(
+            [
+                ("gdex_cn", "!=", False),
+                ("gdex_state", "not in", GDEX_TERMINAL_STATES),
+            ],
+            order="gdex_last_sync asc nulls first, id asc",
+            limit=limit,
+        )
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        for start in range(0, len(pickings), batch_size):
+            batch = pickings[start:start + batch_size]
+            cn_map = {p.gdex_cn: p.id for p in batch}
+            try:
+                statuses = self._gdex_fetch_last_status(list(cn_map))
+            except GdexConnectionError as e:
+                _logger.warning("GDEX tracking sync aborted: %s", e)
+                break
+            except UserError as e:
+                _logger.warning("GDEX tracking sync skipped pickings %s: %s", batch.ids, e)
+                batch.write({"gdex_last_sync": fields.Datetime.now()})
+                if auto_commit:
+                    self.env.cr.commit()
+                continue
+
+            updates = {
+                cn_map[cn]: (status, self._gdex_parse_datetime(date))
+                for cn, (status, date) in statuses.items()
+                if cn in cn_map
+            }
+            batch._gdex_apply_status_updates(updates)
+            batch.write({"gdex_last_sync": fields.Datetime.now()})
+            if auto_commit:
+                self.env.cr.commit()
+        return True
+
+    # ---------------------------------------------------------
+    # CONSIGNMENT LABELS
+    # ---------------------------------------------------------
+    def _gdex_label_filename(self):
+        self.ensure_one()
+        return "GDEX_%s.pdf" % self.gdex_cn
+
+    def _gdex_get_label_attachments(self):
+        """Return {picking_id: ir.attachment} for labels already cached on the pickings."""
+        names = [p._gdex_label_filename() for p in self if p.gdex_cn]
+        if not names:
+            return {}
+        attachments = self.env["ir.attachment"].sudo().search([
+            ("res_model", "=", self._name),
+            ("res_id", "in", self.ids),
+            ("name", "in", names),
+        ], order="id desc")
+        result = {}
+        for attachment in attachments:
+            result.setdefault(attachment.res_id, attachment)
+        return result
+
+    @api.model
+    def _gdex_fetch_labels(self, cns):
+        """Download labels for a list of CNs in one call, return {cn: pdf bytes}."""
+        data = self._gdex_post("GetShippingLabel", list(cns), with_account=True, timeout=60)
+        rows = data.get("data") if isinstance(data, dict) else data
+        result = {}
+        for row in rows or []:
+            if not isinstance(row, dict):
+                continue
+            cn = row.get("cnNo") or row.get("cn") or row.get("CN") or row.get("consignmentNo")
+            label = row.get("label") or row.get("labelData") or row.get("pdf")
+            if cn and label:
+                result[cn] = base64.b64decode(label)
+        return result
+
+    def _gdex_ensure_labels(self, batch_size=50):
+        """Make sure every picking has its label cached as an attachment.
+
+        Only pickings without a cached label hit the carrier, ``batch_size``
+        CNs per request. Returns {picking_id: ir.attachment}.
+        """
+        missing_cn = self.filtered(lambda p: not p.gdex_cn)
+        if missing_cn:
+            raise UserError(_(
+                "These deliveries have no GDEX consignment yet: %s"
+            ) % ", ".join(missing_cn.mapped("name")))
+
+        cached = self._gdex_get_label_attachments()
+        to_fetch = self.filtered(lambda p: p.id not in cached)
+        Attachment = self.env["ir.attachment"].sudo()
+        for start in range(0, len(to_fetch), batch_size):
+            batch = to_fetch[start:start + batch_size]
+            labels = self._gdex_fetch_labels(batch.mapped("gdex_cn"))
+            vals_list = [
+                {
+                    "name": picking._gdex_label_filename(),
+                    "type": "binary",
+                    "raw": labels[picking.gdex_cn],
+                    "res_model": self._name,
+                    "res_id": picking.id,
+                    "mimetype": "application/pdf",
+                }
+                for picking in batch
+                if picking.gdex_cn in labels
+            ]
+            for attachment in Attachment.create(vals_list):
+                cached[attachment.res_id] = attachment
+
+        not_found = self.filtered(lambda p: p.id not in cached)
+        if not_found:
+            raise UserError(_(
+                "GDEX did not return a label for: %s"
+            ) % ", ".join(not_found.mapped("gdex_cn")))
+        return cached
+
+    @api.model
+    def _gdex_open_attachment(self, attachment):
+        """Open an attachment as a binary stream, from the filestore when possible."""
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), "rb")
+        return io.BytesIO(attachment.raw)
+
+    def action_gdex_get_label(self):
+        """Download the GDEX label of one delivery (cached after the first call)."""
+        self.ensure_one()
+        attachment = self._gdex_ensure_labels()[self.id]
+        return {
+            "type": "ir.actions.act_url",
+            "url": "/web/content/%s?download=true" % attachment.id,
+            "target": "self",
+        }
+
+    @api.model
+    def _gdex_merge_labels(self, attachments):
+        """Merge label PDFs into a temporary file and return it (positioned at 0).
+
+        Single pass: every label gets a :class:`LazyLabelStream`, so only one
+        label file is open at a time while the writer resolves pages. The
+        writer still holds the merged page objects until it has written them.
+        """
+        shared = {}
+        streams = [
+            LazyLabelStream(lambda attachment=attachment: self._gdex_open_attachment(attachment), shared)
+            for attachment in attachments
+        ]
+        writer = PdfFileWriter()
+        merged = tempfile.TemporaryFile()
+        try:
+            for stream in streams:
+                reader = PdfFileReader(stream, strict=False)
+                for page_num in range(reader.getNumPages()):
+                    writer.addPage(reader.getPage(page_num))
+            writer.write(merged)
+        except Exception:
+            merged.close()
+            raise
+        finally:
+            for stream in streams:
+                stream.close()
+        merged.seek(0)
+        return merged
+
+    def action_gdex_print_wave(self):
+        """Merge the cached labels of all selected deliveries into one PDF.
+
+        Missing labels are fetched here so GDEX errors show up as a dialog;
+        the merge itself runs in the download route, which streams the
+        temporary file to the browser without storing it.
+        """
+        if not self:
+            raise UserError(_("Please select at least one delivery."))
+        self._gdex_ensure_labels()
+        return {
+            "type": "ir.actions.act_url",
+            "url": "/gdex/labels/wave?ids=%s" % ",".join(str(picking.id) for picking in self),
+            "target": "self",
+        }
+
+    # ---------------------------------------------------------
+    # RATE QUOTES
+    # ---------------------------------------------------------
+    @api.model
+    def _gdex_weight_bucket(self, weight):
+        """GDEX charges per started kilogram: 0.2kg -> 1, 1.3kg -> 2."""
+        try:
+            weight = float(weight or 0.0)
+        except (TypeError, ValueError):
+            weight = 0.0
+        return max(1, math.ceil(weight))
+
+    def _gdex_origin_zip(self):
+        self.ensure_one()
+        warehouse = self.picking_type_id.warehouse_id
+        return (warehouse.partner_id.zip or self.company_id.zip or "").strip()
+
+    @api.model
+    def _gdex_rate_cache_warmup(self, limit=5000):
+        """Seed the rate cache from quotes stored on recent deliveries.
+
+        Only quotes younger than the cache TTL are used, and each one only
+        lives for what remains of its TTL, so a seeded quote expires when a
+        freshly fetched one of the same age would.
+        """
+        now = fields.Datetime.now()
+        pickings = self.search([
+            ("gdex_rate_amount", ">", 0),
+            ("gdex_rate_date", ">", fields.Datetime.subtract(now, seconds=RATE_CACHE.ttl)),
+        ], order="gdex_rate_date desc", limit=limit)
+        pickings.fetch(["partner_id", "picking_type_id", "company_id", "weight", "gdex_rate_amount", "gdex_rate_date"])
+        pickings.partner_id.fetch(["zip"])
+        dbname = self.env.cr.dbname
+        # Oldest first so the most recent quote wins for a shared key
+        for picking in pickings[::-1]:
+            dest = (picking.partner_id.zip or "").strip()
+            origin = picking._gdex_origin_zip()
+            if not (dest and origin):
+                continue
+            remaining = RATE_CACHE.ttl - (now - picking.gdex_rate_date).total_seconds()
+            if remaining <= 0:
+                continue
+            key = (dbname, origin, dest, self._gdex_weight_bucket(picking.weight))
+            RATE_CACHE.put(key, picking.gdex_rate_amount, ttl=remaining)
+        return len(pickings)
+
+    @api.model
+    def _gdex_get_rate(self, origin_zip, dest_zip, weight):
+        """Return the GDEX rate for a parcel, from the cache when possible."""
+        dbname = self.env.cr.dbname
+        if RATE_CACHE.needs_warmup(dbname):
+            self._gdex_rate_cache_warmup()
+
+        key = (dbname, origin_zip, dest_zip, self._gdex_weight_bucket(weight))
+        amount = RATE_CACHE.get(key)
+        if amount is not None:
+            return amount
+
+        data = self._gdex_post("GetShipmentRate", {
+            "fromPostcode": origin_zip,
+            "toPostcode": dest_zip,
+            "weight": key[3],
+            "shipmentType": "Parcel",
+        }, with_account=True)
+        rows = data.get("data") if isinstance(data, dict) else data
+        row = rows[0] if isinstance(rows, list) and rows else rows
+        amount = None
+        if isinstance(row, dict):
+            amount = row.get("rate") or row.get("totalRate") or row.get("amount")
+        elif isinstance(row, (int, float)):
+            amount = row
+        if amount is None:
+            _logger.warning("Unexpected GDEX rate response: %s", data)
+            raise UserError(_("Could not find the rate in GDEX response. Please check logs."))
+
+        amount = float(amount)
+        RATE_CACHE.put(key, amount)
+        return amount
+
+    def action_gdex_get_rate(self):
+        """Quote the GDEX shipping cost of the selected deliveries."""
+        for picking in self:
+            dest = (picking.partner_id.zip or "").strip()
+            origin = picking._gdex_origin_zip()
+            if not (dest and origin):
+                raise UserError(_(
+                    "%s: both the warehouse/company and the receiver need a Postcode (ZIP) for a GDEX rate."
+                ) % picking.name)
+            picking.write({
+                "gdex_rate_amount": self._gdex_get_rate(origin, dest, picking.weight),
+                "gdex_rate_date": fields.Datetime.now(),
+            })
         return True
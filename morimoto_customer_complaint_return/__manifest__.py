@@ -11,8 +11,13 @@
     "data": [
         "security/ir.model.access.csv",
         "data/complaint_sequence.xml",
+        "data/ir_cron.xml",
         "views/customer_complaint_actions.xml",
         "views/customer_complaint_views.xml",
+        "views/complaint_report_job_views.xml",
+        "views/complaint_report_config_views.xml",
+        "views/complaint_import_wizard_views.xml",
+        "views/complaint_report_views.xml",
         "views/customer_complaint_menus.xml",
     ],
     "installable": True,
@@ -1,2 +1,9 @@
 from . import customer_complaint
+from . import complaint_export
 from . import complaint_report_xlsx
+from . import complaint_report_mail
+from . import complaint_report_job
+from . import complaint_report_config
+from . import complaint_rollup
+from . import complaint_report_cache
+from . import complaint_report
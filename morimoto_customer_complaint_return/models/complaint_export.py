@@ -0,0 +1,357 @@
+# morimoto_customer_complaint_return/models/complaint_export.py
+
+from odoo import api, fields, models
+from odoo.osv import expression
+from odoo.tools import format_date
+
+# Berapa record dibaca sekali gus masa export
+REPORT_CHUNK_SIZE = 1000
+# Lebih dari ni, export auto guna streaming mode (constant memory)
+STREAMING_THRESHOLD = 5000
+
+# Sub-issue field ikut complaint_type
+SUB_ISSUE_FIELDS = {
+    "product_quality": "x_studio_product_quality_issue",
+    "delivery_issue": "x_studio_deliveryshipping_issue",
+    "billing_issue": "x_studio_billingpayment_issue",
+    "service": "x_studio_customer_service_issue",
+}
+
+# ---------------------------------------------------------
+# COLUMN SPECS
+# ---------------------------------------------------------
+# type:
+#   char       -> nilai field terus
+#   date       -> tarikh (date_format strftime, atau format_date ikut bahasa user)
+#   selection  -> label selection
+#   m2o        -> nama record (attr: display_name / name)
+#   m2m        -> nama semua record, dipisah ", "
+#   channel    -> tag x_studio_channel, kalau kosong guna label field channel
+#   sub_issue  -> sub-issue ikut complaint_type
+#   line       -> satu baris per return line (attr: product / qty), dipisah "\n"
+
+# Export penuh (Server Action & export dari list view)
+COLUMNS_FULL = [
+    {"title": "Complaint Date", "type": "date", "field": "date_reported", "date_format": "%d/%m/%Y", "width": 12},
+    {"title": "Complaint Number", "type": "char", "field": "name", "width": 18},
+    {"title": "Customer", "type": "m2o", "field": "partner_id", "width": 18},
+    {"title": "Channel", "type": "channel", "width": 20},
+    {"title": "Sales Order/Display Name", "type": "m2o", "field": "sale_order_id", "attr": "name", "width": 20},
+    {"title": "Delivery Order", "type": "m2o", "field": "picking_id", "attr": "name", "width": 20},
+    {"title": "Invoice", "type": "m2o", "field": "invoice_id", "attr": "name", "width": 20},
+    {"title": "Complaint Type", "type": "selection", "field": "complaint_type", "width": 20},
+    {"title": "Product Quality Issue", "type": "selection", "field": "x_studio_product_quality_issue", "width": 22},
+    {"title": "Delivery/Shipping Issue", "type": "selection", "field": "x_studio_deliveryshipping_issue", "width": 22},
+    {"title": "Billing/Payment Issue", "type": "selection", "field": "x_studio_billingpayment_issue", "width": 22},
+    {"title": "Customer Service Issue", "type": "selection", "field": "x_studio_customer_service_issue", "width": 22},
+    {"title": "Status", "type": "selection", "field": "state"},
+    {"title": "Complaint Description", "type": "char", "field": "description", "wrap": True, "width": 40},
+    {"title": "Resolution / Follow-up", "type": "char", "field": "resolution", "wrap": True, "width": 40},
+    {"title": "Internal Notes", "type": "char", "field": "internal_note", "wrap": True, "width": 40},
+    {"title": "Returned Products/Product", "type": "line", "attr": "product", "wrap": True, "width": 25},
+    {"title": "Returned Products/Returned Qty", "type": "line", "attr": "qty", "wrap": True, "width": 25},
+]
+
+# Attachment untuk email monthly report (wizard)
+COLUMNS_EMAIL = [
+    {"title": "Complaint Number", "type": "char", "field": "name", "width": 18},
+    {"title": "Complaint Date", "type": "date", "field": "date_reported", "width": 12},
+    {"title": "Customer", "type": "m2o", "field": "partner_id", "width": 25},
+    {"title": "Department", "type": "m2o", "field": "x_studio_report_from_department", "attr": "name", "width": 20},
+    {"title": "Complaint Type", "type": "selection", "field": "complaint_type", "width": 20},
+    {"title": "Sub Issue", "type": "sub_issue", "width": 22},
+    {"title": "Channel Tags", "type": "m2m", "field": "x_studio_channel", "width": 20},
+    {"title": "Status", "type": "selection", "field": "state", "width": 15},
+    {"title": "Sales Order", "type": "m2o", "field": "sale_order_id", "attr": "name", "width": 15},
+    {"title": "Invoice", "type": "m2o", "field": "invoice_id", "attr": "name", "width": 15},
+    {"title": "Delivery Order", "type": "m2o", "field": "picking_id", "attr": "name", "width": 15},
+]
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class CustomerComplaint(models.Model):
+    _inherit = "customer.complaint"
+
+    # ---------------------------------------------------------
+    # EXPORT ENGINE
+    # ---------------------------------------------------------
+    @api.model
+    def _export_available_columns(self, columns):
+        """Buang column yang field-nya tiada (contoh: field Studio belum wujud)."""
+        available = []
+        for col in columns:
+            if col["type"] == "channel":
+                needed = ["x_studio_channel", "channel"]
+            elif col["type"] == "sub_issue":
+                needed = ["complaint_type"]
+            elif col["type"] == "line":
+                needed = []
+            else:
+                needed = [col["field"]]
+            if all(fname in self._fields for fname in needed):
+                available.append(col)
+        return available
+
+    @api.model
+    def _export_read_fields(self, columns):
+        """Senarai field untuk satu read() per chunk."""
+        names = {"id"}
+        for col in columns:
+            if col["type"] == "channel":
+                names.update(("x_studio_channel", "channel"))
+            elif col["type"] == "sub_issue":
+                names.add("complaint_type")
+                names.update(f for f in SUB_ISSUE_FIELDS.values() if f in self._fields)
+            elif col.get("field"):
+                names.add(col["field"])
+        return sorted(names)
+
+    @api.model
+    def _export_selection_labels(self, columns):
+        """Precompute {field: {value: label}} sekali sahaja untuk semua selection."""
+        fnames = set()
+        for col in columns:
+            if col["type"] == "selection":
+                fnames.add(col["field"])
+            elif col["type"] == "channel":
+                fnames.add("channel")
+            elif col["type"] == "sub_issue":
+                fnames.update(f for f in SUB_ISSUE_FIELDS.values() if f in self._fields)
+        return {
+            fname: dict(self._fields[fname]._description_selection(self.env))
+            for fname in fnames
+        }
+
+    @api.model
+    def _export_iter_id_chunks(self, domain=None, records=None, order=None, streaming=False,
+                               chunk_size=REPORT_CHUNK_SIZE):
+        """Yield list of ids chunk by chunk.
+
+        - ``records``: ikut turutan recordset
+        - ``domain`` + streaming: keyset ikut ``order`` + id (tak perlu simpan
+          semua id); kalau ``order`` tak boleh jadi keyset (lihat
+          :meth:`_export_keyset_order`), ikut id
+        - ``domain`` biasa: ikut ``order``
+        """
+        if records is not None:
+            ids = records._ids
+        elif streaming:
+            keys = self._export_keyset_order(order)
+            key_order = ", ".join("%s %s" % (fname, "desc" if desc else "asc") for fname, desc in keys)
+            fnames = [fname for fname, _desc in keys if fname != "id"]
+            keyset = []
+            while True:
+                chunk = self.search_fetch(domain + keyset, fnames, order=key_order, limit=chunk_size)
+                if not chunk:
+                    return
+                last = chunk[-1]
+                keyset = self._export_keyset_domain(keys, [last[fname] for fname, _desc in keys])
+                yield list(chunk._ids)
+            return
+        else:
+            ids = self.search(domain, order=order)._ids
+        for start in range(0, len(ids), chunk_size):
+            yield list(ids[start:start + chunk_size])
+
+    @api.model
+    def _export_keyset_order(self, order):
+        """``order`` -> [(fname, desc)] berakhir dengan id, untuk keyset pagination.
+
+        Hanya field stored, required & bukan relational / translated (tiada NULL,
+        susunan ikut column sendiri); selain itu guna id sahaja.
+        """
+        keys = []
+        for part in (order or "").split(","):
+            tokens = part.split()
+            if not tokens:
+                continue
+            fname, direction = tokens[0], " ".join(tokens[1:]).lower()
+            field = self._fields.get(fname)
+            if (
+                direction not in ("", "asc", "desc")
+                or not field
+                or not field.store
+                or not (field.required or fname == "id")
+                or field.relational
+                or field.translate
+            ):
+                return [("id", False)]
+            keys.append((fname, direction == "desc"))
+        if not any(fname == "id" for fname, _desc in keys):
+            keys.append(("id", False))
+        return keys
+
+    @api.model
+    def _export_keyset_domain(self, keys, values):
+        """Domain record selepas ``values`` dalam turutan ``keys`` (row comparison)."""
+        branches = []
+        for index, (fname, desc) in enumerate(keys):
+            branch = [(keys[j][0], "=", values[j]) for j in range(index)]
+            branch.append((fname, "<" if desc else ">", values[index]))
+            branches.append(branch)
+        return expression.OR(branches)
+
+    @api.model
+    def _export_load_chunk(self, ids, columns, read_fields):
+        """Load satu chunk: 1 read() + 1 query per related model."""
+        rows = self.browse(ids).read(read_fields)
+
+        # many2one yang perlu attr lain dari display_name (contoh: name)
+        names = {}
+        for col in columns:
+            if col["type"] == "m2o" and col.get("attr", "display_name") != "display_name":
+                fname, attr = col["field"], col["attr"]
+                rel_ids = {row[fname][0] for row in rows if row[fname]}
+                comodel = self.env[self._fields[fname].comodel_name]
+                names[fname] = {
+                    rec["id"]: rec[attr] for rec in comodel.browse(rel_ids).read([attr])
+                }
+
+        # many2many (channel tags dan lain-lain)
+        for col in columns:
+            fname = "x_studio_channel" if col["type"] == "channel" else col.get("field")
+            if col["type"] in ("m2m", "channel") and fname not in names:
+                rel_ids = {rid for row in rows for rid in row[fname]}
+                comodel = self.env[self._fields[fname].comodel_name]
+                names[fname] = {
+                    rec["id"]: rec["display_name"]
+                    for rec in comodel.browse(rel_ids).read(["display_name"])
+                }
+
+        # return lines, grouped ikut complaint
+        lines = {}
+        if any(col["type"] == "line" for col in columns):
+            for line in self.env["customer.complaint.line"].search_read(
+                [("complaint_id", "in", ids)],
+                ["complaint_id", "product_id", "quantity_returned"],
+                order="complaint_id, id",
+            ):
+                lines.setdefault(line["complaint_id"][0], []).append(line)
+        return rows, names, lines
+
+    @api.model
+    def _export_cell(self, col, row, names, lines, labels, date_cache):
+        ctype = col["type"]
+        if ctype == "char":
+            return row[col["field"]] or ""
+        if ctype == "date":
+            value = row[col["field"]]
+            if not value:
+                return ""
+            key = (value, col.get("date_format"))
+            if key not in date_cache:
+                date_cache[key] = (
+                    value.strftime(col["date_format"]) if col.get("date_format")
+                    else format_date(self.env, value)
+                )
+            return date_cache[key]
+        if ctype == "selection":
+            value = row[col["field"]]
+            return labels[col["field"]].get(value, value or "")
+        if ctype == "m2o":
+            value = row[col["field"]]
+            if not value:
+                return ""
+            if col["field"] in names:
+                return names[col["field"]].get(value[0]) or ""
+            return value[1] or ""
+        if ctype == "m2m":
+            mapping = names[col["field"]]
+            return ", ".join(mapping[i] for i in row[col["field"]] if mapping.get(i))
+        if ctype == "channel":
+            if row["x_studio_channel"]:
+                mapping = names["x_studio_channel"]
+                return ", ".join(mapping[i] for i in row["x_studio_channel"] if mapping.get(i))
+            return labels["channel"].get(row["channel"], row["channel"] or "")
+        if ctype == "sub_issue":
+            fname = SUB_ISSUE_FIELDS.get(row["complaint_type"])
+            if not fname or fname not in row:
+                return ""
+            return labels[fname].get(row[fname], row[fname] or "")
+        if ctype == "line":
+            complaint_lines = lines.get(row["id"], [])
+            if col["attr"] == "qty":
+                return "\n".join(str(line["quantity_returned"] or 0) for line in complaint_lines)
+            return "\n".join(
+                (line["product_id"] and line["product_id"][1]) or "" for line in complaint_lines
+            )
+        return ""
+
+    @api.model
+    def _export_complaints_xlsx(self, columns, filename, domain=None, records=None, order=None,
+                                streaming=None, attachment_vals=None, progress_callback=None):
+        """Export complaints to an XLSX attachment using a column spec.
+
+        Complaints come from ``records`` (turutan dikekalkan) atau ``domain``.
+        Semua data satu chunk dimuat sekali gus (read + related names), label
+        selection & format tarikh dikira sekali sahaja. ``streaming=None`` ->
+        auto bila lebih dari STREAMING_THRESHOLD complaint.
+        ``progress_callback(done, total)`` dipanggil lepas setiap chunk.
+
+        Memory semasa tulis row kekal rata; langkah akhir tetap O(saiz fail):
+        bytes xlsx dibaca sekali dari temp file dan disimpan sebagai ``raw``
+        (tanpa salinan base64 tambahan).
+        """
+        if records is not None:
+            records = records.with_env(self.env)
+            total = len(records)
+        else:
+            total = self.search_count(domain)
+        if streaming is None:
+            streaming = total > STREAMING_THRESHOLD
+
+        columns = self._export_available_columns(columns)
+        read_fields = self._export_read_fields(columns)
+        labels = self._export_selection_labels(columns)
+        date_cache = {}
+
+        workbook, target = self._xlsx_open_workbook(streaming)
+        sheet = workbook.add_worksheet("Complaints")
+        header_fmt = workbook.add_format({"bold": True, "bg_color": "#DDDDDD"})
+        wrap_fmt = workbook.add_format({"text_wrap": True})
+
+        for col_idx, col in enumerate(columns):
+            sheet.write(0, col_idx, col["title"], header_fmt)
+            if col.get("width"):
+                sheet.set_column(col_idx, col_idx, col["width"])
+
+        row_idx = 1
+        for ids in self._export_iter_id_chunks(domain, records, order, streaming):
+            rows, names, lines = self._export_load_chunk(ids, columns, read_fields)
+            for row in rows:
+                for col_idx, col in enumerate(columns):
+                    value = self._export_cell(col, row, names, lines, labels, date_cache)
+                    if col.get("wrap"):
+                        sheet.write(row_idx, col_idx, value, wrap_fmt)
+                    else:
+                        sheet.write(row_idx, col_idx, value)
+                row_idx += 1
+            # buang cache chunk ni supaya memory kekal rata
+            self.env.invalidate_all()
+            if progress_callback:
+                progress_callback(row_idx - 1, total)
+
+        xlsx_data = self._xlsx_close_workbook(workbook, target)
+
+        vals = {
+            "name": filename,
+            "type": "binary",
+            "raw": xlsx_data,
+            "mimetype": XLSX_MIMETYPE,
+        }
+        vals.update(attachment_vals or {})
+        return self.env["ir.attachment"].create(vals)
+
+    # ---------------------------------------------------------
+    # AD-HOC EXPORT (list view action)
+    # ---------------------------------------------------------
+    def action_export_xlsx(self):
+        """Export complaint yang dipilih (semua column) dan download terus."""
+        filename = "Complaints_%s.xlsx" % fields.Date.context_today(self).strftime("%Y%m%d")
+        attachment = self._export_complaints_xlsx(COLUMNS_FULL, filename, records=self)
+        return {
+            "type": "ir.actions.act_url",
+            "url": "/web/content/%s?download=true" % attachment.id,
+            "target": "self",
+        }
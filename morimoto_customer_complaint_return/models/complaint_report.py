@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, tools
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, table_exists
+
+
+class CustomerComplaintReport(models.Model):
+    """Analisis complaint: satu row per return line (atau per complaint tanpa line).
+
+    ``complaint_count`` ialah id complaint dengan aggregator count_distinct, jadi
+    kiraan tetap betul walaupun filter / group by product atau reason. Masa
+    untuk close ada dalam ``customer.complaint.close.report`` (satu row per complaint).
+    """
+
+    _name = "customer.complaint.report"
+    _description = "Customer Complaint Analysis"
+    _auto = False
+    _rec_name = "complaint_id"
+    _order = "date_reported desc"
+
+    complaint_id = fields.Many2one("customer.complaint", string="Complaint", readonly=True)
+    date_reported = fields.Date(string="Complaint Date", readonly=True)
+    date_closed = fields.Datetime(string="Closed On", readonly=True)
+    state = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["state"].selection,
+        string="Status",
+        readonly=True,
+    )
+    channel = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["channel"].selection,
+        string="Channel",
+        readonly=True,
+    )
+    complaint_type = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["complaint_type"].selection,
+        string="Complaint Type",
+        readonly=True,
+    )
+    department_name = fields.Char(string="Department", readonly=True)
+    partner_id = fields.Many2one("res.partner", string="Customer", readonly=True)
+    responsible_id = fields.Many2one("res.users", string="Responsible", readonly=True)
+    company_id = fields.Many2one("res.company", string="Company", readonly=True)
+
+    product_id = fields.Many2one("product.product", string="Product", readonly=True)
+    reason = fields.Selection(
+        selection=lambda self: self.env["customer.complaint.line"]._fields["reason"].selection,
+        string="Return Reason",
+        readonly=True,
+    )
+
+    complaint_count = fields.Integer(string="# Complaints", readonly=True, aggregator="count_distinct")
+    line_count = fields.Integer(string="# Return Lines", readonly=True, aggregator="sum")
+    quantity_returned = fields.Float(string="Qty Returned", readonly=True, aggregator="sum")
+    quantity_purchased = fields.Float(string="Qty Purchased", readonly=True, aggregator="sum")
+
+    def _department_sql(self):
+        """(expression, join) department: Studio field + hr_department, kalau wujud."""
+        cr = self.env.cr
+        if column_exists(cr, "customer_complaint", "x_studio_report_from_department") and table_exists(
+            cr, "hr_department"
+        ):
+            return (
+                SQL("hd.complete_name"),
+                SQL("LEFT JOIN hr_department hd ON hd.id = c.x_studio_report_from_department"),
+            )
+        return SQL("NULL::varchar"), SQL("")
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        dept_expr, dept_join = self._department_sql()
+        self.env.cr.execute(SQL(
+            """
+            CREATE OR REPLACE VIEW %(table)s AS (
+                SELECT row_number() OVER (ORDER BY c.id, l.id) AS id,
+                       c.id AS complaint_id,
+                       c.date_reported,
+                       c.date_closed,
+                       c.state,
+                       c.channel,
+                       c.complaint_type,
+                       %(dept)s AS department_name,
+                       c.partner_id,
+                       c.responsible_id,
+                       c.company_id,
+                       l.product_id,
+                       l.reason,
+                       c.id AS complaint_count,
+                       CASE WHEN l.id IS NULL THEN 0 ELSE 1 END AS line_count,
+                       COALESCE(l.quantity_returned, 0) AS quantity_returned,
+                       COALESCE(l.quantity_purchased, 0) AS quantity_purchased
+                  FROM customer_complaint c
+             LEFT JOIN customer_complaint_line l ON l.complaint_id = c.id
+                       %(dept_join)s
+            )
+            """,
+            table=SQL.identifier(self._table),
+            dept=dept_expr,
+            dept_join=dept_join,
+        ))
+
+
+class CustomerComplaintCloseReport(models.Model):
+    """Analisis time-to-close: satu row per complaint (tiada join ke line)."""
+
+    _name = "customer.complaint.close.report"
+    _description = "Customer Complaint Time to Close"
+    _auto = False
+    _rec_name = "complaint_id"
+    _order = "date_reported desc"
+
+    complaint_id = fields.Many2one("customer.complaint", string="Complaint", readonly=True)
+    date_reported = fields.Date(string="Complaint Date", readonly=True)
+    date_closed = fields.Datetime(string="Closed On", readonly=True)
+    state = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["state"].selection,
+        string="Status",
+        readonly=True,
+    )
+    channel = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["channel"].selection,
+        string="Channel",
+        readonly=True,
+    )
+    complaint_type = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["complaint_type"].selection,
+        string="Complaint Type",
+        readonly=True,
+    )
+    department_name = fields.Char(string="Department", readonly=True)
+    partner_id = fields.Many2one("res.partner", string="Customer", readonly=True)
+    responsible_id = fields.Many2one("res.users", string="Responsible", readonly=True)
+    company_id = fields.Many2one("res.company", string="Company", readonly=True)
+
+    complaint_count = fields.Integer(string="# Complaints", readonly=True, aggregator="sum")
+    days_to_close = fields.Float(string="Days to Close", readonly=True, aggregator="avg")
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        dept_expr, dept_join = self.env["customer.complaint.report"]._department_sql()
+        self.env.cr.execute(SQL(
+            """
+            CREATE OR REPLACE VIEW %(table)s AS (
+                SELECT c.id,
+                       c.id AS complaint_id,
+                       c.date_reported,
+                       c.date_closed,
+                       c.state,
+                       c.channel,
+                       c.complaint_type,
+                       %(dept)s AS department_name,
+                       c.partner_id,
+                       c.responsible_id,
+                       c.company_id,
+                       1 AS complaint_count,
+                       CASE WHEN c.date_closed IS NOT NULL
+                            THEN EXTRACT(EPOCH FROM (c.date_closed - c.date_reported::timestamp)) / 86400.0
+                       END AS days_to_close
+                  FROM customer_complaint c
+                       %(dept_join)s
+            )
+            """,
+            table=SQL.identifier(self._table),
+            dept=dept_expr,
+            dept_join=dept_join,
+        ))
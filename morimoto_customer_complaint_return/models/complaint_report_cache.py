@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class CustomerComplaintReportCache(models.Model):
+    _name = "customer.complaint.report.cache"
+    _description = "Complaint Report Cache"
+    _order = "last_used desc"
+
+    key = fields.Char(string="Key", required=True, readonly=True, index=True)
+    domain = fields.Text(string="Domain", readonly=True)
+    date_from = fields.Date(string="Date From", readonly=True)
+    date_to = fields.Date(string="Date To", readonly=True)
+    fingerprint = fields.Char(
+        string="Data Fingerprint",
+        readonly=True,
+        help="Bilangan complaint + max write_date dalam tempoh masa cache dibina.",
+    )
+    summary = fields.Text(string="Summary (JSON)", readonly=True)
+    attachment_id = fields.Many2one(
+        "ir.attachment", string="Excel File", readonly=True, ondelete="set null"
+    )
+    hit_count = fields.Integer(string="Hits", readonly=True)
+    last_used = fields.Datetime(string="Last Used", readonly=True)
+
+    _sql_constraints = [
+        ("key_uniq", "unique(key)", "Complaint report cache key must be unique!"),
+    ]
+
+    # ---------------------------------------------------------
+    # KEY & FRESHNESS
+    # ---------------------------------------------------------
+    @api.model
+    def _make_key(self, domain, variant):
+        """Hash domain (dah serialize) + variant + bahasa (label & format tarikh ikut lang)."""
+        raw = json.dumps({
+            "domain": self.env["customer.complaint.report.job"]._serialize_domain(domain),
+            "variant": variant,
+            "lang": self.env.lang or "",
+        }, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @api.model
+    def _fingerprint(self, date_from, date_to):
+        """Satu query: count + max(write_date) untuk semua complaint dalam tempoh.
+
+        Guna tempoh penuh (bukan domain filter) sebab state counts dalam
+        summary ikut tempoh penuh. Edit -> write_date naik, delete -> count turun.
+        """
+        Complaint = self.env["customer.complaint"]
+        [(count, max_write)] = Complaint._read_group(
+            Complaint._report_base_domain(date_from, date_to), [], ["__count", "write_date:max"]
+        )
+        return "%s|%s" % (count, max_write and fields.Datetime.to_string(max_write) or "")
+
+    # ---------------------------------------------------------
+    # LOOKUP / STORE
+    # ---------------------------------------------------------
+    @api.model
+    def _lookup(self, domain, date_from, date_to, variant="email"):
+        """Return (entry, summary) kalau cache masih fresh, else (entry_or_empty, None)."""
+        key = self._make_key(domain, variant)
+        entry = self.sudo().search([("key", "=", key)], limit=1)
+        fingerprint = self._fingerprint(date_from, date_to)
+        if entry and entry.fingerprint == fingerprint and entry.summary and (
+            entry.attachment_id or not json.loads(entry.summary).get("total")
+        ):
+            entry.write({"hit_count": entry.hit_count + 1, "last_used": fields.Datetime.now()})
+            _logger.info("Complaint report cache hit %s", key[:12])
+            return entry, json.loads(entry.summary)
+        return entry, None
+
+    @api.model
+    def _get_or_build(self, domain, date_from, date_to, build_attachment, variant="email"):
+        """Return (summary, attachment), rebuild hanya kalau data dah berubah.
+
+        ``build_attachment(summary, attachment_vals)`` dipanggil bila cache
+        miss dan perlu return ir.attachment (atau False kalau tiada data).
+        """
+        entry, summary = self._lookup(domain, date_from, date_to, variant)
+        if summary is not None:
+            return summary, entry.attachment_id
+
+        # Fingerprint diambil SEBELUM bina, supaya edit semasa bina buat cache stale
+        fingerprint = self._fingerprint(date_from, date_to)
+        summary = self.env["customer.complaint"]._report_summary(domain, date_from, date_to)
+        vals = {
+            "key": self._make_key(domain, variant),
+            "domain": self.env["customer.complaint.report.job"]._serialize_domain(domain),
+            "date_from": date_from,
+            "date_to": date_to,
+            "fingerprint": fingerprint,
+            "summary": json.dumps(summary),
+            "last_used": fields.Datetime.now(),
+        }
+        entry = entry.sudo()
+        if entry:
+            # Fail lama cuma dilepaskan: mail / job lama mungkin masih rujuk,
+            # _gc_unused_entries buang bila tiada lagi rujukan
+            entry.write(dict(vals, attachment_id=False))
+        else:
+            entry = self.sudo().create(vals)
+
+        attachment = build_attachment(summary, {"res_model": self._name, "res_id": entry.id})
+        entry.attachment_id = attachment.id if attachment else False
+        return summary, attachment
+
+    @api.autovacuum
+    def _gc_unused_entries(self):
+        """Buang cache yang tak diguna lebih 30 hari, dan fail Excel yang dah tiada rujukan.
+
+        Fail hanya dibuang bila tiada cache entry, mail (message_attachment_rel)
+        atau report job yang masih merujuknya.
+        """
+        limit = fields.Datetime.now() - timedelta(days=30)
+        self.sudo().search([("last_used", "<", limit)]).unlink()
+
+        attachments = self.env["ir.attachment"].sudo().search([("res_model", "=", self._name)])
+        if not attachments:
+            return
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            SELECT a.id
+              FROM unnest(%s) AS a(id)
+             WHERE NOT EXISTS (SELECT 1 FROM customer_complaint_report_cache c WHERE c.attachment_id = a.id)
+               AND NOT EXISTS (SELECT 1 FROM customer_complaint_report_job j WHERE j.attachment_id = a.id)
+               AND NOT EXISTS (SELECT 1 FROM message_attachment_rel r WHERE r.attachment_id = a.id)
+            """,
+            [attachments.ids],
+        )
+        unused = self.env["ir.attachment"].sudo().browse([row[0] for row in self.env.cr.fetchall()])
+        if unused:
+            _logger.info("Complaint report cache: %s unused Excel files removed", len(unused))
+            unused.unlink()
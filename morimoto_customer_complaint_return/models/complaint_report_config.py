@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+
+class CustomerComplaintReportConfig(models.Model):
+    _name = "customer.complaint.report.config"
+    _description = "Complaint Report Distribution List"
+    _order = "name"
+
+    name = fields.Char(string="Name", required=True)
+    active = fields.Boolean(default=True)
+    subject_prefix = fields.Char(string="Subject Prefix")
+
+    recipient_partner_ids = fields.Many2many(
+        "res.partner",
+        "customer_complaint_report_config_partner_rel",
+        "config_id",
+        "partner_id",
+        string="Recipients",
+    )
+    extra_emails = fields.Char(
+        string="Other Emails",
+        help="Email tambahan, dipisah koma.",
+    )
+
+    # Filter (kosong = semua)
+    complaint_type = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["complaint_type"].selection,
+        string="Complaint Type",
+    )
+    channel = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["channel"].selection,
+        string="Channel",
+    )
+    state = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["state"].selection,
+        string="Status",
+    )
+
+    job_ids = fields.One2many("customer.complaint.report.job", "config_id", string="Report Jobs")
+
+    # ---------------------------------------------------------
+    # HELPERS
+    # ---------------------------------------------------------
+    def _build_domain(self, date_from, date_to):
+        self.ensure_one()
+        domain = self.env["customer.complaint"]._report_base_domain(date_from, date_to)
+        for fname in ("complaint_type", "channel", "state"):
+            if self[fname]:
+                domain.append((fname, "=", self[fname]))
+        return domain
+
+    def _recipient_emails(self):
+        """Semua penerima (partner + email tambahan), unik, dipisah koma."""
+        self.ensure_one()
+        emails = [p.email_formatted for p in self.recipient_partner_ids if p.email]
+        emails += [e.strip() for e in (self.extra_emails or "").split(",") if e.strip()]
+        return ", ".join(dict.fromkeys(emails))
+
+    @api.model
+    def _previous_month(self):
+        first = fields.Date.context_today(self).replace(day=1)
+        return first - relativedelta(months=1), first - relativedelta(days=1)
+
+    # ---------------------------------------------------------
+    # SEND
+    # ---------------------------------------------------------
+    def _send(self, date_from, date_to):
+        """Queue satu job per senarai; Excel & summary dikongsi semua penerima."""
+        jobs = self.env["customer.complaint.report.job"]
+        for config in self:
+            recipients = config._recipient_emails()
+            if not recipients:
+                raise UserError(_("Distribution list %s has no recipient with an email address.") % config.name)
+            jobs |= jobs._enqueue(
+                config._build_domain(date_from, date_to),
+                date_from,
+                date_to,
+                recipients,
+                subject_prefix=config.subject_prefix or "[%s]" % config.name,
+                config=config,
+            )
+        return jobs
+
+    def action_send_previous_month(self):
+        date_from, date_to = self._previous_month()
+        jobs = self._send(date_from, date_to)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Report queued"),
+                "message": _("%s report(s) for %s → %s will be emailed once ready.") % (
+                    len(jobs),
+                    date_from,
+                    date_to,
+                ),
+                "type": "info",
+            },
+        }
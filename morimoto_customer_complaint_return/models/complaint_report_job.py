@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import threading
+from datetime import date, timedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import AccessError
+from odoo.tools import email_split_and_format
+
+from .complaint_export import COLUMNS_EMAIL
+
+_logger = logging.getLogger(__name__)
+
+# Job "running" tanpa update (progress commit) selama ini dianggap mati
+# (worker dibunuh oleh limit_time_real_cron / restart)
+RUNNING_TIMEOUT = timedelta(minutes=30)
+
+
+class CustomerComplaintReportJob(models.Model):
+    _name = "customer.complaint.report.job"
+    _description = "Complaint Report Job"
+    _order = "id desc"
+
+    name = fields.Char(string="Report", required=True, readonly=True)
+    user_id = fields.Many2one(
+        "res.users",
+        string="Requested By",
+        default=lambda self: self.env.user,
+        readonly=True,
+    )
+    date_from = fields.Date(string="Date From", required=True, readonly=True)
+    date_to = fields.Date(string="Date To", required=True, readonly=True)
+    domain = fields.Text(string="Domain", required=True, readonly=True, default="[]")
+    subject_prefix = fields.Char(string="Subject Prefix", readonly=True)
+    recipient_email = fields.Char(
+        string="Recipients",
+        required=True,
+        readonly=True,
+        help="Satu atau lebih email, dipisah koma. Semua berkongsi Excel yang sama.",
+    )
+    config_id = fields.Many2one(
+        "customer.complaint.report.config",
+        string="Distribution List",
+        readonly=True,
+        ondelete="set null",
+    )
+
+    state = fields.Selection(
+        [
+            ("queued", "Queued"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        default="queued",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    progress = fields.Integer(string="Progress (%)", readonly=True)
+    attachment_id = fields.Many2one("ir.attachment", string="Excel File", readonly=True)
+    mail_ids = fields.Many2many("mail.mail", string="Emails", readonly=True)
+    error = fields.Text(string="Error", readonly=True)
+
+    # ---------------------------------------------------------
+    # QUEUE
+    # ---------------------------------------------------------
+    @api.model
+    def _serialize_domain(self, domain):
+        """Domain -> JSON (tarikh jadi string supaya boleh simpan)."""
+        return json.dumps([
+            [leaf[0], leaf[1], fields.Date.to_string(leaf[2]) if isinstance(leaf[2], date) else leaf[2]]
+            if isinstance(leaf, (list, tuple)) else leaf
+            for leaf in domain
+        ])
+
+    @api.model
+    def _enqueue(self, domain, date_from, date_to, recipient_email, subject_prefix="", config=None):
+        """Queue satu report dan trigger cron, return job.
+
+        User biasa cuma ada read access; job dibuat sebagai sudo dengan
+        ``user_id`` dipaksa kepada user semasa (report render ikut access dia).
+        """
+        job = self.sudo().create({
+            "user_id": self.env.uid,
+            "config_id": config.id if config else False,
+            "name": "%s %s → %s" % (subject_prefix or _("Complaints Report"), date_from, date_to),
+            "domain": self._serialize_domain(domain),
+            "date_from": date_from,
+            "date_to": date_to,
+            "recipient_email": recipient_email,
+            "subject_prefix": subject_prefix,
+        })
+        self.env.ref("morimoto_customer_complaint_return.ir_cron_complaint_report_job")._trigger()
+        return job
+
+    # ---------------------------------------------------------
+    # WORKER
+    # ---------------------------------------------------------
+    @api.model
+    def _cron_process_jobs(self, limit=5):
+        """Process queued jobs; SKIP LOCKED supaya worker selari tak ambil job sama."""
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        self._fail_stale_jobs()
+        if auto_commit:
+            self.env.cr.commit()
+        for _i in range(limit):
+            self.env.cr.execute(
+                """
+                SELECT id FROM customer_complaint_report_job
+                 WHERE state = 'queued'
+                 ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+                """
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                break
+            job = self.browse(row[0])
+            job.write({"state": "running", "progress": 0, "error": False})
+            if auto_commit:
+                self.env.cr.commit()
+            try:
+                job._run(auto_commit=auto_commit)
+            except Exception as e:
+                _logger.exception("Complaint report job %s failed", job.id)
+                if not auto_commit:
+                    raise
+                self.env.cr.rollback()
+                job.write({"state": "failed", "error": str(e)})
+            if auto_commit:
+                self.env.cr.commit()
+        return True
+
+    def _set_progress(self, progress, auto_commit):
+        self.write({"progress": progress})
+        if auto_commit:
+            self.env.cr.commit()
+
+    def _run(self, auto_commit=False):
+        """Bina summary + Excel, queue email (dihantar oleh mail cron)."""
+        self.ensure_one()
+        # Render ikut bahasa & company user yang minta report
+        Complaint = self.env["customer.complaint"].with_user(self.user_id).with_context(
+            lang=self.user_id.lang,
+        )
+        domain = json.loads(self.domain)
+        filename = "Monthly_Complaints_%s_%s.xlsx" % (self.date_from, self.date_to)
+
+        def progress_callback(done, total):
+            self._set_progress(10 + int(80 * done / (total or 1)), auto_commit)
+
+        def build_attachment(summary, attachment_vals):
+            self._set_progress(10, auto_commit)
+            if not summary["total"]:
+                return False
+            return Complaint._export_complaints_xlsx(
+                COLUMNS_EMAIL,
+                filename,
+                domain=domain,
+                order="date_reported, name",
+                attachment_vals=attachment_vals,
+                progress_callback=progress_callback,
+            )
+
+        # Data tak berubah -> guna semula summary & Excel dari cache
+        summary, attachment = self.env["customer.complaint.report.cache"].with_env(
+            Complaint.env
+        )._get_or_build(domain, self.date_from, self.date_to, build_attachment)
+
+        # Subject & body render sekali; satu mail per penerima, create sekali gus,
+        # semua rujuk attachment yang sama (tiada salinan fail)
+        subject = Complaint._report_subject(self.date_from, self.date_to, self.subject_prefix or "")
+        body_html = Complaint._report_body_html(domain, self.date_from, self.date_to, summary)
+        email_from = self.user_id.email_formatted or "info@morimotoformulas.com"
+        attachment_ids = [(4, attachment.id)] if attachment else []
+        mails = self.env["mail.mail"].sudo().create([
+            {
+                "subject": subject,
+                "body_html": body_html,
+                "email_from": email_from,
+                "email_to": email_to,
+                "attachment_ids": attachment_ids,
+            }
+            for email_to in self._recipient_list()
+        ])
+        self.write({
+            "state": "done",
+            "progress": 100,
+            "attachment_id": attachment.id if attachment else False,
+            "mail_ids": [(6, 0, mails.ids)],
+        })
+        # Email keluar ikut mail queue biasa; trigger supaya tak tunggu lama
+        self.env.ref("mail.ir_cron_mail_scheduler_action")._trigger()
+        return True
+
+    def _recipient_list(self):
+        self.ensure_one()
+        return list(dict.fromkeys(email_split_and_format(self.recipient_email or "")))
+
+    @api.model
+    def _stale_running_domain(self):
+        return [
+            ("state", "=", "running"),
+            ("write_date", "<", fields.Datetime.now() - RUNNING_TIMEOUT),
+        ]
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """Job "running" yang tak bergerak lebih RUNNING_TIMEOUT -> failed (boleh retry)."""
+        stale = self.search(self._stale_running_domain())
+        if stale:
+            _logger.warning("Complaint report jobs %s interrupted, marked failed", stale.ids)
+            stale.write({
+                "state": "failed",
+                "error": _("Interrupted (worker timeout or restart). Use Retry to run it again."),
+            })
+        return stale
+
+    def action_retry(self):
+        # hanya pemilik job atau admin boleh queue semula
+        if not self.env.is_system() and any(job.user_id.id != self.env.uid for job in self):
+            raise AccessError(_("You can only retry your own report jobs."))
+        # failed, atau running yang dah tergantung (sebelum cron sempat tandakan)
+        jobs = self.filtered(lambda j: j.state == "failed") | self.filtered_domain(
+            self._stale_running_domain()
+        )
+        jobs.sudo().write({"state": "queued", "error": False})
+        self.env.ref("morimoto_customer_complaint_return.ir_cron_complaint_report_job")._trigger()
+        return True
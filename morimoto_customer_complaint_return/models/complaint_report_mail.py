@@ -0,0 +1,149 @@
+# morimoto_customer_complaint_return/models/complaint_report_mail.py
+
+from odoo import api, fields, models
+from odoo.tools import format_date
+
+
+class CustomerComplaint(models.Model):
+    _inherit = "customer.complaint"
+
+    # ---------------------------------------------------------
+    # MONTHLY REPORT: SUMMARY & EMAIL
+    # ---------------------------------------------------------
+    @api.model
+    def _report_base_domain(self, date_from, date_to):
+        return [
+            ("date_reported", ">=", date_from),
+            ("date_reported", "<=", date_to),
+        ]
+
+    @api.model
+    def _report_is_date_only(self, domain, date_from, date_to):
+        """True kalau domain cuma filter tarikh (boleh jawab terus dari rollup)."""
+        base = self._report_base_domain(fields.Date.to_date(date_from), fields.Date.to_date(date_to))
+        try:
+            normalized = [
+                (leaf[0], leaf[1], fields.Date.to_date(leaf[2])) for leaf in domain
+            ]
+        except (TypeError, ValueError, IndexError):
+            return False
+        return normalized == base
+
+    @api.model
+    def _report_summary(self, domain, date_from, date_to):
+        """Kira summary guna grouped query sahaja (bilangan query tetap).
+
+        State counts ikut base domain (tarikh sahaja) supaya tak double
+        filter; department, type & channel ikut ``domain`` penuh. Untuk
+        domain tarikh sahaja semuanya dijawab dari daily rollup.
+        """
+        Rollup = self.env["customer.complaint.rollup"]
+        if self._report_is_date_only(domain, date_from, date_to):
+            return Rollup._summary(date_from, date_to)
+
+        state_counts = Rollup._summary(date_from, date_to)["state"]
+
+        dept_summary = {}
+        if "x_studio_report_from_department" in self._fields:
+            for dept, count in self._read_group(
+                domain, ["x_studio_report_from_department"], ["__count"], order="__count desc"
+            ):
+                dname = dept.name if dept else "Unassigned"
+                dept_summary[dname] = dept_summary.get(dname, 0) + count
+
+        type_summary = {}
+        for ctype, count in self._read_group(
+            domain, ["complaint_type"], ["__count"], order="__count desc"
+        ):
+            t = ctype or "Unassigned"
+            type_summary[t] = type_summary.get(t, 0) + count
+
+        # many2many: complaint dengan 2 tag dikira dalam kedua-dua tag
+        channel_summary = {}
+        if "x_studio_channel" in self._fields:
+            for tag, count in self._read_group(
+                domain, ["x_studio_channel"], ["__count"], order="__count desc"
+            ):
+                tname = tag.name if tag else "Unassigned"
+                channel_summary[tname] = channel_summary.get(tname, 0) + count
+
+        return {
+            "total": self.search_count(domain),
+            "state": state_counts,
+            "department": dept_summary,
+            "complaint_type": type_summary,
+            "channel": channel_summary,
+        }
+
+    @api.model
+    def _report_subject(self, date_from, date_to, subject_prefix=""):
+        return "%s Monthly Complaints Report (%s → %s)" % (
+            subject_prefix,
+            format_date(self.env, date_from),
+            format_date(self.env, date_to),
+        )
+
+    @api.model
+    def _report_body_html(self, domain, date_from, date_to, summary):
+        """Render body email monthly report dari summary."""
+
+        def summary_html(counts):
+            parts = ["- <b>%s</b>: %s" % (name, value) for name, value in counts.items()]
+            return "<br>".join(parts) if parts else "No data"
+
+        # Latest 5 complaints dalam domain yang sama
+        latest = self.search(domain, order="create_date desc", limit=5)
+        latest_parts = []
+        for c in latest:
+            latest_parts.append(
+                "<li>%s – %s – %s</li>"
+                % (
+                    c.name or "",
+                    c.partner_id.display_name or "",
+                    c.state or "",
+                )
+            )
+        latest_html = "".join(latest_parts) or "<li>No complaints in this period.</li>"
+
+        states = summary["state"]
+        return """
+        <p>Hi Boss,</p>
+
+        <p>Here is the Monthly Complaints Report for <b>%s</b> to <b>%s</b>:</p>
+
+        <h3>1. Summary</h3>
+        <ul>
+            <li><b>Total Complaints:</b> %s</li>
+            <li><b>New:</b> %s</li>
+            <li><b>In Progress:</b> %s</li>
+            <li><b>Waiting Return Stock:</b> %s</li>
+            <li><b>Closed:</b> %s</li>
+        </ul>
+
+        <h3>2. By Department</h3>
+        <p>%s</p>
+
+        <h3>3. By Complaint Type</h3>
+        <p>%s</p>
+
+        <h3>4. By Channel</h3>
+        <p>%s</p>
+
+        <h3>5. Latest Complaints</h3>
+        <ul>%s</ul>
+
+        <p>Excel file with full complaint list is attached.</p>
+        <p>Please log in to Odoo for full details.</p>
+        """ % (
+            format_date(self.env, date_from),
+            format_date(self.env, date_to),
+            summary["total"],
+            states.get("new", 0),
+            states.get("in_progress", 0),
+            states.get("waiting_return", 0),
+            states.get("closed", 0),
+            summary_html(summary["department"]),
+            summary_html(summary["complaint_type"]),
+            summary_html(summary["channel"]),
+            latest_html,
+        )
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+WATERMARK_PARAM = "morimoto_customer_complaint_return.rollup_watermark"
+
+
+class CustomerComplaintRollupPending(models.Model):
+    """Tarikh rollup yang perlu dikira semula tapi tak nampak pada watermark
+    write_date (complaint dipadam, atau date_reported lama selepas ditukar).
+    Insert sahaja dalam transaksi user; cron yang refresh & kosongkan."""
+
+    _name = "customer.complaint.rollup.pending"
+    _description = "Customer Complaint Rollup Pending Date"
+    _log_access = False
+
+    date = fields.Date(string="Date", required=True)
+
+
+class CustomerComplaintRollup(models.Model):
+    _name = "customer.complaint.rollup"
+    _description = "Customer Complaint Daily Rollup"
+    _order = "date desc"
+
+    date = fields.Date(string="Date", required=True, index=True, readonly=True)
+    state = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["state"].selection,
+        string="Status",
+        readonly=True,
+    )
+    complaint_type = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["complaint_type"].selection,
+        string="Complaint Type",
+        readonly=True,
+    )
+    department_id = fields.Integer(
+        string="Department ID",
+        readonly=True,
+        help="hr.department id dari x_studio_report_from_department (0 = tiada).",
+    )
+    channel_key = fields.Char(
+        string="Channel Tags",
+        readonly=True,
+        help="crm.tag ids dari x_studio_channel, sorted & dipisah koma (kosong = tiada).",
+    )
+    complaint_count = fields.Integer(string="Complaints", readonly=True)
+
+    # ---------------------------------------------------------
+    # REFRESH
+    # ---------------------------------------------------------
+    def init(self):
+        super().init()
+        # Install / upgrade: rollup kosong -> bina penuh sekarang, bukan tunggu cron
+        self.env.cr.execute("SELECT 1 FROM customer_complaint_rollup LIMIT 1")
+        if not self.env.cr.fetchone():
+            self.env["ir.config_parameter"].sudo().set_param(WATERMARK_PARAM, False)
+            self._cron_sync()
+
+    @api.model
+    def _rollup_select_sql(self, dates):
+        """SELECT (date, state, complaint_type, department_id, channel_key, count) untuk ``dates``."""
+        Complaint = self.env["customer.complaint"]
+        if "x_studio_report_from_department" in Complaint._fields:
+            dept_expr = SQL("COALESCE(c.x_studio_report_from_department, 0)")
+        else:
+            dept_expr = SQL("0")
+
+        channel_field = Complaint._fields.get("x_studio_channel")
+        if channel_field:
+            channel_expr = SQL(
+                "COALESCE((SELECT string_agg(r.%s::text, ',' ORDER BY r.%s) FROM %s r WHERE r.%s = c.id), '')",
+                SQL.identifier(channel_field.column2),
+                SQL.identifier(channel_field.column2),
+                SQL.identifier(channel_field.relation),
+                SQL.identifier(channel_field.column1),
+            )
+        else:
+            channel_expr = SQL("''")
+
+        return SQL(
+            """
+            SELECT c.date_reported, c.state, c.complaint_type, %(dept)s, %(channel)s, count(*)
+              FROM customer_complaint c
+             WHERE c.date_reported = ANY(%(dates)s)
+             GROUP BY 1, 2, 3, 4, 5
+            """,
+            dept=dept_expr,
+            channel=channel_expr,
+            dates=dates,
+        )
+
+    @api.model
+    def _refresh_dates(self, dates):
+        """Kira semula rollup untuk tarikh-tarikh ini sahaja (satu query)."""
+        dates = sorted({fields.Date.to_date(d) for d in dates if d})
+        if not dates:
+            return
+        self.env["customer.complaint"].flush_model()
+        self.env.cr.execute(SQL(
+            "DELETE FROM customer_complaint_rollup WHERE date = ANY(%s)", dates,
+        ))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO customer_complaint_rollup
+                   (date, state, complaint_type, department_id, channel_key, complaint_count,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT r.*, %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM (%(select)s) r
+            """,
+            select=self._rollup_select_sql(dates),
+            uid=self.env.uid,
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_sync(self, batch_size=500):
+        """Refresh tarikh complaint yang berubah sejak watermark (write_date),
+        ditambah tarikh dalam queue pending (unlink / tukar date_reported).
+
+        Watermark kosong -> bina semula semua (contoh: lepas install).
+        Rollup hanya ditulis di sini, bukan dalam transaksi user.
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        watermark = ICP.get_param(WATERMARK_PARAM)
+        Complaint = self.env["customer.complaint"].with_context(active_test=False)
+        domain = [("write_date", ">", watermark)] if watermark else []
+
+        groups = Complaint._read_group(
+            domain, ["date_reported:day"], ["write_date:max"]
+        )
+        pending = self.env["customer.complaint.rollup.pending"].sudo().search([])
+        dates = sorted({day for day, _max in groups} | set(pending.mapped("date")))
+        if not dates:
+            return True
+        for start in range(0, len(dates), batch_size):
+            self._refresh_dates(dates[start:start + batch_size])
+        pending.unlink()
+        if groups:
+            new_watermark = max(max_date for _day, max_date in groups)
+            ICP.set_param(WATERMARK_PARAM, fields.Datetime.to_string(new_watermark))
+        _logger.info("Complaint rollup refreshed for %s days", len(dates))
+        return True
+
+    @api.model
+    def _dirty_dates(self, date_from, date_to):
+        """Tarikh dalam julat yang belum disync oleh cron (berubah selepas watermark / pending)."""
+        watermark = self.env["ir.config_parameter"].sudo().get_param(WATERMARK_PARAM)
+        date_domain = [("date_reported", ">=", date_from), ("date_reported", "<=", date_to)]
+        if watermark:
+            date_domain.append(("write_date", ">", watermark))
+        dates = {
+            day
+            for [day] in self.env["customer.complaint"].with_context(active_test=False)._read_group(
+                date_domain, ["date_reported:day"]
+            )
+        }
+        dates.update(self.env["customer.complaint.rollup.pending"].sudo().search([
+            ("date", ">=", date_from), ("date", "<=", date_to),
+        ]).mapped("date"))
+        return sorted(dates)
+
+    # ---------------------------------------------------------
+    # QUERY
+    # ---------------------------------------------------------
+    @api.model
+    def _summary(self, date_from, date_to):
+        """Summary sama format dengan customer.complaint._report_summary, dari rollup."""
+        # Tarikh yang cron belum sync dikira terus dari complaint (read-only)
+        dirty = self._dirty_dates(date_from, date_to)
+        rows = self.search_read(
+            [("date", ">=", date_from), ("date", "<=", date_to), ("date", "not in", dirty)],
+            ["state", "complaint_type", "department_id", "channel_key", "complaint_count"],
+        )
+        if dirty:
+            self.env["customer.complaint"].flush_model()
+            self.env.cr.execute(self._rollup_select_sql(dirty))
+            rows += [
+                {
+                    "state": state,
+                    "complaint_type": complaint_type,
+                    "department_id": department_id,
+                    "channel_key": channel_key,
+                    "complaint_count": count,
+                }
+                for _date, state, complaint_type, department_id, channel_key, count in self.env.cr.fetchall()
+            ]
+        total = 0
+        state_counts = {}
+        type_counts = {}
+        dept_counts = {}
+        tag_counts = {}
+        for row in rows:
+            count = row["complaint_count"]
+            total += count
+            state_counts[row["state"]] = state_counts.get(row["state"], 0) + count
+            ctype = row["complaint_type"] or "Unassigned"
+            type_counts[ctype] = type_counts.get(ctype, 0) + count
+            dept_counts[row["department_id"]] = dept_counts.get(row["department_id"], 0) + count
+            tag_ids = [int(t) for t in (row["channel_key"] or "").split(",") if t]
+            for tag_id in tag_ids or [0]:
+                tag_counts[tag_id] = tag_counts.get(tag_id, 0) + count
+
+        def named(counts, model_name):
+            names = {}
+            if model_name in self.env:
+                # ``name`` (bukan display_name / complete_name), sama macam path filtered
+                records = self.env[model_name].browse([i for i in counts if i]).exists()
+                names = {rec.id: rec.name for rec in records}
+            result = {}
+            for rec_id, count in sorted(counts.items(), key=lambda kv: -kv[1]):
+                name = names.get(rec_id, "Unassigned")
+                result[name] = result.get(name, 0) + count
+            return result
+
+        Complaint = self.env["customer.complaint"]
+        return {
+            "total": total,
+            "state": state_counts,
+            "department": named(dept_counts, "hr.department")
+            if "x_studio_report_from_department" in Complaint._fields else {},
+            "complaint_type": dict(sorted(type_counts.items(), key=lambda kv: -kv[1])),
+            "channel": named(tag_counts, "crm.tag")
+            if "x_studio_channel" in Complaint._fields else {},
+        }
+
+
+class CustomerComplaint(models.Model):
+    _inherit = "customer.complaint"
+
+    # ---------------------------------------------------------
+    # ROLLUP MAINTENANCE
+    # ---------------------------------------------------------
+    def _queue_rollup_dates(self, dates):
+        dates = {d for d in dates if d}
+        if dates:
+            self.env["customer.complaint.rollup.pending"].sudo().create([{"date": d} for d in dates])
+
+    def write(self, vals):
+        # tarikh baru nampak pada watermark; tarikh lama tidak
+        if "date_reported" in vals:
+            new_date = fields.Date.to_date(vals["date_reported"])
+            self._queue_rollup_dates({rec.date_reported for rec in self if rec.date_reported != new_date})
+        return super().write(vals)
+
+    def unlink(self):
+        self._queue_rollup_dates(set(self.mapped("date_reported")))
+        return super().unlink()
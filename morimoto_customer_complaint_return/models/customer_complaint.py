@@ -1,5 +1,41 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models
+import difflib
+import logging
+import threading
+from datetime import timedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import AccessError, UserError
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, create_index, drop_index, has_trigram
+
+_logger = logging.getLogger(__name__)
+
+# Field teks untuk carian full-text (trigram index)
+FULLTEXT_FIELDS = ("description", "resolution", "internal_note")
+
+# Duplicate check: complaint customer sama dalam +/- sekian hari
+DUPLICATE_WINDOW_DAYS = 14
+DUPLICATE_MIN_SIMILARITY = 0.6
+
+# Lebih dari ini record -> state transition guna bulk mode (tracking batch)
+BULK_STATE_THRESHOLD = 100
+
+# Composite index untuk filter report/wizard: (nama, [column], column wajib wujud)
+# Column Studio hanya di-index kalau dah wujud dalam table.
+COMPLAINT_INDEXES = [
+    # ikut _order list view: date_reported desc, id desc
+    ("customer_complaint_date_id_desc_idx", ["date_reported DESC", "id DESC"], None),
+    ("customer_complaint_state_date_idx", ["state", "date_reported"], None),
+    ("customer_complaint_type_date_idx", ["complaint_type", "date_reported"], None),
+    # partner_id leading -> juga cover carian partner sahaja
+    ("customer_complaint_partner_date_idx", ["partner_id", "date_reported"], None),
+    (
+        "customer_complaint_department_date_idx",
+        ["x_studio_report_from_department", "date_reported"],
+        "x_studio_report_from_department",
+    ),
+]
 
 
 class CustomerComplaint(models.Model):
@@ -43,6 +79,13 @@ class CustomerComplaint(models.Model):
         tracking=True,
     )
 
+    external_ref = fields.Char(
+        string="Marketplace Reference",
+        copy=False,
+        index="btree_not_null",
+        help="Order / complaint ID from the marketplace export this complaint was imported from.",
+    )
+
     complaint_type = fields.Selection(
         [
             ("product_quality", "Product Quality"),
@@ -84,6 +127,7 @@ class CustomerComplaint(models.Model):
         string="Sales Order",
         domain="[('partner_id', '=', partner_id)]",
         tracking=True,
+        index="btree_not_null",
     )
 
     invoice_id = fields.Many2one(
@@ -98,6 +142,7 @@ class CustomerComplaint(models.Model):
         string="Delivery Order",
         domain="[('partner_id', '=', partner_id)]",
         tracking=True,
+        index="btree_not_null",
     )
 
     # ---------------------------------------------------------
@@ -106,17 +151,20 @@ class CustomerComplaint(models.Model):
     description = fields.Text(
         string="Complaint Description",
         help="Details of customer's complaint.",
+        index="trigram",
         tracking=True,
     )
 
     internal_note = fields.Text(
         string="Internal Notes",
         help="Internal notes for staff only.",
+        index="trigram",
     )
 
     resolution = fields.Text(
         string="Resolution / Follow-up",
         help="How the complaint was handled and final decision.",
+        index="trigram",
     )
 
     # ---------------------------------------------------------
@@ -145,6 +193,21 @@ class CustomerComplaint(models.Model):
         store=True,
     )
 
+    return_picking_ids = fields.Many2many(
+        "stock.picking",
+        "customer_complaint_return_picking_rel",
+        "complaint_id",
+        "picking_id",
+        string="Return Receipts",
+        copy=False,
+        readonly=True,
+    )
+
+    return_picking_count = fields.Integer(
+        string="Return Receipts Count",
+        compute="_compute_return_picking_count",
+    )
+
     # ---------------------------------------------------------
     # STATUS & RESPONSIBLE
     # ---------------------------------------------------------
@@ -161,6 +224,27 @@ class CustomerComplaint(models.Model):
         tracking=True,
     )
 
+    duplicate_of_id = fields.Many2one(
+        "customer.complaint",
+        string="Possible Duplicate Of",
+        copy=False,
+        index="btree_not_null",
+    )
+
+    is_possible_duplicate = fields.Boolean(
+        string="Possible Duplicate",
+        copy=False,
+        help="Ditanda semasa create bila complaint lain dari customer sama, "
+        "dalam tempoh berdekatan, merujuk SO/DO sama atau deskripsi hampir sama.",
+    )
+
+    date_closed = fields.Datetime(
+        string="Closed On",
+        readonly=True,
+        copy=False,
+        help="Diset bila complaint ditukar ke Closed (untuk analisis time-to-close).",
+    )
+
     responsible_id = fields.Many2one(
         "res.users",
         string="Responsible",
@@ -180,10 +264,84 @@ class CustomerComplaint(models.Model):
     # ---------------------------------------------------------
     @api.depends("return_line_ids.quantity_returned")
     def _compute_return_totals(self):
+        # Record tersimpan: satu grouped query untuk semua complaint
+        stored = self.filtered(lambda r: r.id)
+        totals = {}
+        if stored:
+            for complaint, qty, count in self.env["customer.complaint.line"]._read_group(
+                [("complaint_id", "in", stored.ids)],
+                ["complaint_id"],
+                ["quantity_returned:sum", "__count"],
+            ):
+                totals[complaint.id] = (qty, count)
+        for rec in self:
+            if rec.id:
+                rec.return_total_qty, rec.return_line_count = totals.get(rec.id, (0.0, 0))
+            else:
+                # Record baru dalam form (onchange): kira dari cache
+                rec.return_total_qty = sum(rec.return_line_ids.mapped("quantity_returned"))
+                rec.return_line_count = len(rec.return_line_ids)
+
+    @api.model
+    def _resync_return_totals(self, batch_size=10000):
+        """Selaraskan semula return_total_qty / return_line_count semua complaint.
+
+        Satu UPDATE ... FROM (aggregate) per chunk id; hanya row yang berbeza ditulis.
+        """
+        self.flush_model()
+        self.env["customer.complaint.line"].flush_model()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        cr = self.env.cr
+        cr.execute("SELECT min(id), max(id) FROM customer_complaint")
+        min_id, max_id = cr.fetchone()
+        updated = 0
+        for start in range(min_id or 0, (max_id or -1) + 1, batch_size):
+            cr.execute(
+                """
+                UPDATE customer_complaint c
+                   SET return_total_qty = t.qty,
+                       return_line_count = t.cnt
+                  FROM (
+                        SELECT c2.id,
+                               COALESCE(SUM(l.quantity_returned), 0) AS qty,
+                               COUNT(l.id) AS cnt
+                          FROM customer_complaint c2
+                     LEFT JOIN customer_complaint_line l ON l.complaint_id = c2.id
+                         WHERE c2.id >= %s AND c2.id < %s
+                      GROUP BY c2.id
+                       ) t
+                 WHERE c.id = t.id
+                   AND (c.return_total_qty IS DISTINCT FROM t.qty
+                        OR c.return_line_count IS DISTINCT FROM t.cnt)
+                """,
+                [start, start + batch_size],
+            )
+            updated += cr.rowcount
+            if auto_commit:
+                cr.commit()
+        self.invalidate_model(["return_total_qty", "return_line_count"])
+        _logger.info("Complaint return totals resynced, %s complaints corrected", updated)
+        return updated
+
+    def action_resync_return_totals(self):
+        # method public boleh dipanggil melalui RPC; server action sahaja ada group_system
+        if not self.env.is_system():
+            raise AccessError(_("Only administrators can resync return totals."))
+        updated = self._resync_return_totals()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Return Totals"),
+                "message": _("%s complaints corrected.") % updated,
+                "type": "success",
+            },
+        }
+
+    @api.depends("return_picking_ids")
+    def _compute_return_picking_count(self):
         for rec in self:
-            total = sum(rec.return_line_ids.mapped("quantity_returned"))
-            rec.return_total_qty = total
-            rec.return_line_count = len(rec.return_line_ids)
+            rec.return_picking_count = len(rec.return_picking_ids)
 
     # ---------------------------------------------------------
     # UNIQUE COMPLAINT NUMBER
@@ -192,13 +350,212 @@ class CustomerComplaint(models.Model):
         ("name_uniq", "unique(name)", "Complaint number must be unique!"),
     ]
 
+    def init(self):
+        super().init()
+        for index_name, expressions, required_column in COMPLAINT_INDEXES:
+            if required_column and not column_exists(self.env.cr, self._table, required_column):
+                continue
+            create_index(self.env.cr, index_name, self._table, expressions)
+        # dulu index=True pada date_reported; customer_complaint_date_id_desc_idx dah cover
+        drop_index(self.env.cr, "customer_complaint__date_reported_index", self._table)
+        self._backfill_date_closed()
+
+    def _backfill_date_closed(self):
+        """Isi date_closed untuk complaint closed sebelum field wujud.
+
+        Guna tarikh mesej tracking ``state`` terakhir (complaint sekarang closed,
+        jadi perubahan state terakhir = masa ditutup); fallback write_date.
+        """
+        self.env.cr.execute(SQL(
+            """
+            UPDATE customer_complaint c
+               SET date_closed = COALESCE(
+                       (SELECT MAX(m.date)
+                          FROM mail_message m
+                          JOIN mail_tracking_value v ON v.mail_message_id = m.id
+                          JOIN ir_model_fields f ON f.id = v.field_id
+                         WHERE m.model = %(model)s
+                           AND m.res_id = c.id
+                           AND f.model = %(model)s
+                           AND f.name = 'state'),
+                       c.write_date
+                   )
+             WHERE c.state = 'closed'
+               AND c.date_closed IS NULL
+            """,
+            model=self._name,
+        ))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        to_number = [vals for vals in vals_list if vals.get("name", "New") == "New"]
+        if to_number:
+            names = self._reserve_complaint_numbers(len(to_number))
+            for vals, name in zip(to_number, names):
+                vals["name"] = name
+        for vals in vals_list:
+            if vals.get("state") == "closed" and "date_closed" not in vals:
+                vals["date_closed"] = fields.Datetime.now()
+        records = super().create(vals_list)
+        if not self.env.context.get("skip_duplicate_check"):
+            records._flag_possible_duplicates()
+        return records
+
+    def write(self, vals):
+        if "state" not in vals or "date_closed" in vals:
+            return super().write(vals)
+        # date_closed hanya untuk record yang baru masuk / keluar dari closed
+        if vals["state"] == "closed":
+            changed, date_closed = self.filtered(lambda r: r.state != "closed"), fields.Datetime.now()
+        else:
+            changed, date_closed = self.filtered(lambda r: r.state == "closed"), False
+        res = super().write(vals)
+        if changed:
+            changed.write({"date_closed": date_closed})
+        return res
+
     @api.model
-    def create(self, vals):
-        if vals.get("name", "New") == "New":
-            vals["name"] = (
-                self.env["ir.sequence"].next_by_code("customer.complaint") or "New"
+    def _reserve_complaint_numbers(self, count):
+        """Reserve ``count`` complaint numbers in one sequence call.
+
+        Standard sequence: satu ``nextval`` atas generate_series.
+        No-gap sequence: satu UPDATE ... RETURNING (row dikunci sekali).
+        Sequence dengan date range: fallback satu-satu ikut ir.sequence.
+        """
+        sequence = self.env["ir.sequence"].sudo().search(
+            [
+                ("code", "=", "customer.complaint"),
+                ("company_id", "in", [self.env.company.id, False]),
+            ],
+            order="company_id",
+            limit=1,
+        )
+        if not sequence:
+            return ["New"] * count
+        if sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+
+        cr = self.env.cr
+        if sequence.implementation == "standard":
+            cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ["ir_sequence_%03d" % sequence.id, count],
+            )
+            numbers = [row[0] for row in cr.fetchall()]
+        else:
+            cr.execute(
+                """
+                UPDATE ir_sequence
+                   SET number_next = number_next + number_increment * %s
+                 WHERE id = %s
+             RETURNING number_next - number_increment * %s, number_increment
+                """,
+                [count, sequence.id, count],
             )
-        return super().create(vals)
+            first, increment = cr.fetchone()
+            numbers = [first + increment * i for i in range(count)]
+            sequence.invalidate_recordset(["number_next"])
+        return [sequence.get_next_char(number) for number in numbers]
+
+    # ---------------------------------------------------------
+    # FULL-TEXT SEARCH
+    # ---------------------------------------------------------
+    @api.model
+    def search_fulltext(self, text, limit=80):
+        """Cari complaint ikut description / resolution / internal note, paling relevan dulu.
+
+        ``ilike`` ditapis oleh trigram index; susunan ikut ``word_similarity``
+        (pg_trgm). Tanpa pg_trgm, fallback ke ``search`` biasa.
+        """
+        text = (text or "").strip()
+        if not text:
+            return self.browse()
+        domain = ["|"] * (len(FULLTEXT_FIELDS) - 1) + [
+            (fname, "ilike", text) for fname in FULLTEXT_FIELDS
+        ]
+        if not has_trigram(self.env.cr):
+            return self.search(domain, limit=limit)
+
+        query = self._search(domain, limit=limit)
+        scores = SQL(", ").join(
+            SQL(
+                "word_similarity(%s, COALESCE(%s, ''))",
+                text,
+                self._field_to_sql(self._table, fname, query),
+            )
+            for fname in FULLTEXT_FIELDS
+        )
+        query.order = SQL(
+            "GREATEST(%s) DESC, %s DESC", scores, SQL.identifier(self._table, "id")
+        )
+        return self.browse(query.get_result_ids())
+
+    # ---------------------------------------------------------
+    # DUPLICATE DETECTION
+    # ---------------------------------------------------------
+    @api.model
+    def _normalize_description(self, text):
+        return " ".join((text or "").lower().split())
+
+    def _flag_possible_duplicates(self):
+        """Tanda complaint baru yang mungkin duplicate.
+
+        Satu search calon (partner + julat tarikh, guna index partner/date),
+        kemudian banding SO/DO dan deskripsi (difflib) dalam set kecil itu.
+        """
+        if not self:
+            return
+        window = timedelta(days=DUPLICATE_WINDOW_DAYS)
+        dates = self.mapped("date_reported")
+        candidates = self.search([
+            ("partner_id", "in", self.partner_id.ids),
+            ("date_reported", ">=", min(dates) - window),
+            ("date_reported", "<=", max(dates) + window),
+            ("state", "!=", "cancelled"),
+            ("id", "not in", self.ids),
+        ], order="id")
+        by_partner = {}
+        for candidate in candidates:
+            by_partner.setdefault(candidate.partner_id.id, []).append(candidate)
+
+        to_flag = {}
+        for rec in self:
+            pool = by_partner.setdefault(rec.partner_id.id, [])
+            match = rec._find_duplicate_in(pool, window)
+            if match:
+                to_flag.setdefault(match, []).append(rec.id)
+            # complaint awal dalam batch yang sama juga jadi calon
+            pool.append(rec)
+        for original, rec_ids in to_flag.items():
+            self.browse(rec_ids).write({
+                "duplicate_of_id": original.id,
+                "is_possible_duplicate": True,
+            })
+
+    def _find_duplicate_in(self, candidates, window):
+        self.ensure_one()
+        description = self._normalize_description(self.description)
+        best, best_score = None, DUPLICATE_MIN_SIMILARITY
+        for candidate in candidates:
+            if abs(candidate.date_reported - self.date_reported) > window:
+                continue
+            if (self.sale_order_id and candidate.sale_order_id == self.sale_order_id) or (
+                self.picking_id and candidate.picking_id == self.picking_id
+            ):
+                return candidate
+            other = self._normalize_description(candidate.description)
+            if not description or not other:
+                continue
+            matcher = difflib.SequenceMatcher(None, description, other)
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def action_clear_duplicate(self):
+        self.write({"duplicate_of_id": False, "is_possible_duplicate": False})
 
     # ---------------------------------------------------------
     # ONCHANGE: SALES ORDER -> CUSTOMER, INVOICE, DO
@@ -235,54 +592,279 @@ class CustomerComplaint(models.Model):
     @api.onchange("picking_id")
     def _onchange_picking_id_load_lines(self):
         """When a Delivery Order is chosen, load its products into Returned Products tab."""
+        lines_by_picking = self._prepare_return_lines_from_pickings(
+            self.mapped("picking_id")._origin.ids
+        )
         for rec in self:
             if not rec.picking_id:
                 # Clear lines if DO cleared
                 rec.return_line_ids = [(5, 0, 0)]
                 continue
+            lines_vals = [
+                (0, 0, vals) for vals in lines_by_picking.get(rec.picking_id._origin.id, [])
+            ]
+            # (5, 0, 0) clear existing lines, then add new ones
+            rec.return_line_ids = [(5, 0, 0)] + lines_vals
 
-            lines_vals = []
-            for move in rec.picking_id.move_ids_without_package:
-                # Skip services if any
-                if move.product_id.type == "service":
-                    continue
-
+    @api.model
+    def _prepare_return_lines_from_pickings(self, picking_ids):
+        """Return {picking_id: [line vals]} untuk semua DO dalam satu search_read.
+
+        Ikut move_ids_without_package; service ditapis dalam query.
+        """
+        if not picking_ids:
+            return {}
+        moves = self.env["stock.move"].search_read(
+            [
+                ("picking_id", "in", picking_ids),
+                ("product_id.type", "!=", "service"),
+                "|",
+                ("package_level_id", "=", False),
+                ("picking_type_entire_packs", "=", False),
+            ],
+            ["picking_id", "product_id", "quantity", "product_uom_qty", "product_uom"],
+        )
+        result = {}
+        for move in moves:
+            result.setdefault(move["picking_id"][0], []).append({
+                "product_id": move["product_id"][0],
                 # Use delivered qty (quantity if validated, else planned qty)
-                qty_delivered = move.quantity or move.product_uom_qty
-
-                lines_vals.append(
-                    (
-                        0,
-                        0,
-                        {
-                            "product_id": move.product_id.id,
-                            "quantity_purchased": qty_delivered,
-                            "uom_id": move.product_uom.id,
-                            # quantity_returned staff akan isi sendiri
-                        },
-                    )
-                )
+                "quantity_purchased": move["quantity"] or move["product_uom_qty"],
+                "uom_id": move["product_uom"][0],
+                # quantity_returned staff akan isi sendiri
+            })
+        return result
+
+    def action_load_return_lines(self):
+        """Isi return lines dari DO untuk semua complaint ini (satu pass).
+
+        Complaint yang dah ada lines (input staff) atau return receipt
+        tidak disentuh.
+        """
+        records = self.filtered(
+            lambda r: r.picking_id and not r.return_line_ids and not r.return_picking_ids
+        )
+        lines_by_picking = self._prepare_return_lines_from_pickings(records.picking_id.ids)
+        self.env["customer.complaint.line"].create([
+            dict(vals, complaint_id=rec.id)
+            for rec in records
+            for vals in lines_by_picking.get(rec.picking_id.id, [])
+        ])
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Return Lines"),
+                "message": _(
+                    "Lines loaded for %(loaded)s complaints; %(skipped)s skipped "
+                    "(no delivery order, existing lines or return receipts)."
+                ) % {"loaded": len(records), "skipped": len(self) - len(records)},
+                "type": "info",
+                "next": {"type": "ir.actions.client", "tag": "soft_reload"},
+            },
+        }
 
-            # (5, 0, 0) clear existing lines, then add new ones
-            rec.return_line_ids = [(5, 0, 0)] + lines_vals
+    # ---------------------------------------------------------
+    # RETURN PICKINGS
+    # ---------------------------------------------------------
+    def action_create_return_pickings(self):
+        """Jana return receipt untuk semua complaint ini sekali gus.
+
+        Line dikumpul ikut (DO asal, warehouse): satu receipt per kumpulan,
+        semua picking & move dicipta secara batch, satu action_confirm,
+        dan complaint ditukar ke waiting_return dalam satu write.
+        """
+        complaints = self.filtered(
+            lambda r: r.is_return_involved
+            and r.picking_id
+            and not r.return_picking_ids.filtered(lambda p: p.state != "cancel")
+        )
+        lines = complaints.return_line_ids.filtered(lambda l: l.quantity_returned > 0)
+        if not lines:
+            raise UserError(_(
+                "No complaint with a delivery order and returned quantities is waiting for a return receipt."
+            ))
+
+        groups = {}
+        for line in lines:
+            picking = line.complaint_id.picking_id
+            key = (picking, picking.picking_type_id.warehouse_id)
+            groups.setdefault(key, self.env["customer.complaint.line"])
+            groups[key] |= line
+
+        # move asal ikut (DO, product) untuk origin_returned_move_id, satu search_read
+        origin_moves = {}
+        for move in self.env["stock.move"].search_read(
+            [
+                ("picking_id", "in", [picking.id for picking, _wh in groups]),
+                ("product_id", "in", lines.product_id.ids),
+                ("state", "!=", "cancel"),
+            ],
+            ["picking_id", "product_id"],
+            order="id",
+        ):
+            origin_moves.setdefault((move["picking_id"][0], move["product_id"][0]), move["id"])
+
+        picking_vals = []
+        for (picking, warehouse), group_lines in groups.items():
+            return_type = picking.picking_type_id.return_picking_type_id or warehouse.in_type_id
+            if not return_type:
+                raise UserError(_("No return operation type is configured for %s.") % picking.name)
+            picking_vals.append({
+                "picking_type_id": return_type.id,
+                "partner_id": picking.partner_id.id,
+                "origin": _("Return of %(picking)s (%(complaints)s)") % {
+                    "picking": picking.name,
+                    "complaints": ", ".join(group_lines.complaint_id.mapped("name")),
+                },
+                "location_id": picking.location_dest_id.id,
+                "location_dest_id": return_type.default_location_dest_id.id or picking.location_id.id,
+                "company_id": picking.company_id.id,
+                "return_id": picking.id,
+            })
+        returns = self.env["stock.picking"].create(picking_vals)
+
+        move_vals = []
+        returns_by_complaint = {}
+        for ((picking, _warehouse), group_lines), ret in zip(groups.items(), returns):
+            for line in group_lines:
+                move_vals.append({
+                    "name": line.product_id.display_name,
+                    "product_id": line.product_id.id,
+                    "product_uom_qty": line.quantity_returned,
+                    "product_uom": (line.uom_id or line.product_id.uom_id).id,
+                    "picking_id": ret.id,
+                    "location_id": ret.location_id.id,
+                    "location_dest_id": ret.location_dest_id.id,
+                    "partner_id": ret.partner_id.id,
+                    "company_id": ret.company_id.id,
+                    "origin_returned_move_id": origin_moves.get((picking.id, line.product_id.id)),
+                    "procure_method": "make_to_stock",
+                })
+                returns_by_complaint.setdefault(line.complaint_id, set()).add(ret.id)
+        self.env["stock.move"].create(move_vals)
+        returns.action_confirm()
+
+        # complaint dengan set receipt sama ditulis bersama
+        by_returns = {}
+        for complaint, return_ids in returns_by_complaint.items():
+            by_returns.setdefault(frozenset(return_ids), self.browse())
+            by_returns[frozenset(return_ids)] |= complaint
+        for return_ids, group in by_returns.items():
+            group.write({"return_picking_ids": [(4, rid) for rid in return_ids]})
+        self.browse([c.id for c in returns_by_complaint])._set_state("waiting_return")
+
+        return self._action_view_pickings(returns)
+
+    def action_view_return_pickings(self):
+        self.ensure_one()
+        return self._action_view_pickings(self.return_picking_ids)
+
+    def _action_view_pickings(self, pickings):
+        action = self.env["ir.actions.act_window"]._for_xml_id("stock.action_picking_tree_all")
+        if len(pickings) == 1:
+            action.update({
+                "views": [(False, "form")],
+                "res_id": pickings.id,
+            })
+        else:
+            action["domain"] = [("id", "in", pickings.ids)]
+        return action
 
     # ---------------------------------------------------------
     # STATE BUTTONS
     # ---------------------------------------------------------
     def action_set_new(self):
-        self.write({"state": "new"})
+        self._set_state("new")
 
     def action_set_in_progress(self):
-        self.write({"state": "in_progress"})
+        self._set_state("in_progress")
 
     def action_set_waiting_return(self):
-        self.write({"state": "waiting_return"})
+        self._set_state("waiting_return")
 
     def action_set_closed(self):
-        self.write({"state": "closed"})
+        self._set_state("closed")
 
     def action_set_cancelled(self):
-        self.write({"state": "cancelled"})
+        self._set_state("cancelled")
+
+    def action_bulk_set_closed(self):
+        self._set_state("closed", bulk=True)
+
+    def _set_state(self, state, bulk=None, tracking="summary"):
+        """Tukar state. Recordset besar guna bulk mode:
+
+        satu ``write`` tanpa mail tracking, kemudian sama ada satu mesej
+        tracking ringkas per complaint (``tracking="summary"``, insert
+        secara batch) atau satu audit entry sahaja (``tracking="audit"``).
+        """
+        if bulk is None:
+            bulk = len(self) > BULK_STATE_THRESHOLD
+        if not bulk:
+            return self.write({"state": state})
+
+        records = self.filtered(lambda r: r.state != state)
+        if not records:
+            return True
+        old_states = {rec.id: rec.state for rec in records}
+        res = records.with_context(tracking_disable=True).write({"state": state})
+        if tracking == "audit":
+            records._log_state_audit(state, old_states)
+        else:
+            records._post_state_tracking(state, old_states)
+        return res
+
+    def _post_state_tracking(self, state, old_states):
+        """Satu mesej tracking per complaint, create dalam dua batch insert."""
+        labels = dict(self._fields["state"]._description_selection(self.env))
+        author = self.env.user.partner_id
+        subtype = self.env.ref("mail.mt_note")
+        messages = self.env["mail.message"].sudo().create([
+            {
+                "model": self._name,
+                "res_id": rec.id,
+                "message_type": "notification",
+                "subtype_id": subtype.id,
+                "author_id": author.id,
+                "body": "",
+            }
+            for rec in self
+        ])
+        field = self.env["ir.model.fields"]._get(self._name, "state")
+        self.env["mail.tracking.value"].sudo().create([
+            {
+                "field_id": field.id,
+                "mail_message_id": message.id,
+                "old_value_char": labels.get(old_states[rec.id], old_states[rec.id] or ""),
+                "new_value_char": labels.get(state, state),
+            }
+            for rec, message in zip(self, messages)
+        ])
+
+    def _log_state_audit(self, state, old_states):
+        """Satu ir.logging entry untuk keseluruhan bulk transition."""
+        counts = {}
+        for old_state in old_states.values():
+            counts[old_state] = counts.get(old_state, 0) + 1
+        message = "User %s set %s complaints to %s (from %s): ids %s" % (
+            self.env.user.login,
+            len(self),
+            state,
+            ", ".join("%s x%s" % (k, v) for k, v in sorted(counts.items(), key=lambda kv: str(kv[0]))),
+            ",".join(str(i) for i in self.ids),
+        )
+        _logger.info(message)
+        self.env["ir.logging"].sudo().create({
+            "name": self._name,
+            "type": "server",
+            "dbname": self.env.cr.dbname,
+            "level": "INFO",
+            "message": message,
+            "path": __name__,
+            "func": "_set_state",
+            "line": "0",
+        })
 
 
 class CustomerComplaintLine(models.Model):
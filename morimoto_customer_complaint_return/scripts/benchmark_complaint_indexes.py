@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark query report/wizard complaint, sebelum & selepas index.
+
+Jalankan dalam odoo shell (tiada data sebenar diubah, semua dalam TEMP
+table dan transaction di-rollback):
+
+    odoo-bin shell -d <db> <<'PY'
+    from odoo.addons.morimoto_customer_complaint_return.scripts.benchmark_complaint_indexes import run
+    run(env, rows=500000)
+    PY
+"""
+import json
+import time
+
+from odoo.addons.morimoto_customer_complaint_return.models.customer_complaint import (
+    COMPLAINT_INDEXES,
+)
+
+TABLE = "bench_customer_complaint"
+
+# (label, SQL) - sama bentuk dengan query ORM dari _build_domain / summary
+QUERIES = [
+    (
+        "list view: period, order date desc, id desc (80)",
+        "SELECT id FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s "
+        "ORDER BY date_reported DESC, id DESC LIMIT 80",
+    ),
+    (
+        "report: period (all)",
+        "SELECT id FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s "
+        "ORDER BY date_reported, name",
+    ),
+    (
+        "summary: period group by state",
+        "SELECT state, count(*) FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s GROUP BY state",
+    ),
+    (
+        "filter: period + state",
+        "SELECT id FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s AND state = 'closed'",
+    ),
+    (
+        "filter: period + complaint_type",
+        "SELECT id FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s "
+        "AND complaint_type = 'delivery_issue'",
+    ),
+    (
+        "filter: period + partner",
+        "SELECT id FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s AND partner_id = %(partner)s",
+    ),
+    (
+        "filter: period + department",
+        "SELECT id FROM {t} WHERE date_reported BETWEEN %(d1)s AND %(d2)s "
+        "AND x_studio_report_from_department = %(dept)s",
+    ),
+]
+
+PARAMS = {"d1": "2025-03-01", "d2": "2025-03-31", "partner": 42, "dept": 3}
+
+
+def _seed(cr, rows):
+    cr.execute("DROP TABLE IF EXISTS %s" % TABLE)
+    cr.execute("""
+        CREATE TEMP TABLE {t} (
+            id serial PRIMARY KEY,
+            name varchar NOT NULL,
+            date_reported date NOT NULL,
+            state varchar,
+            complaint_type varchar,
+            partner_id integer NOT NULL,
+            x_studio_report_from_department integer,
+            description text
+        )
+    """.format(t=TABLE))
+    cr.execute("""
+        INSERT INTO {t} (name, date_reported, state, complaint_type, partner_id,
+                         x_studio_report_from_department, description)
+        SELECT 'CC/BENCH/' || g,
+               DATE '2023-01-01' + (random() * 1095)::int,
+               (ARRAY['new','in_progress','waiting_return','closed','cancelled'])[1 + (random() * 4)::int],
+               (ARRAY['product_quality','delivery_issue','billing_issue','service',
+                      'return_request','other'])[1 + (random() * 5)::int],
+               1 + (random() * 20000)::int,
+               1 + (random() * 15)::int,
+               md5(g::text)
+          FROM generate_series(1, %s) g
+    """.format(t=TABLE), [rows])
+    cr.execute("ANALYZE %s" % TABLE)
+
+
+def _time_queries(cr, repeat):
+    results = {}
+    for label, query in QUERIES:
+        timings = []
+        plan_node = ""
+        for _i in range(repeat):
+            cr.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query.format(t=TABLE), PARAMS)
+            plan = cr.fetchone()[0]
+            plan = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+            timings.append(plan["Execution Time"])
+            plan_node = plan["Plan"]["Node Type"]
+        timings.sort()
+        results[label] = (timings[len(timings) // 2], plan_node)
+    return results
+
+
+def run(env, rows=500000, repeat=5):
+    """Seed ``rows`` complaint sintetik, ukur query sebelum & selepas index.
+
+    Return list of dict: query, before_ms, after_ms, plan sebelum/selepas.
+    """
+    cr = env.cr
+    cr.execute("SAVEPOINT complaint_index_bench")
+    try:
+        started = time.time()
+        _seed(cr, rows)
+        print("Seeded %s rows in %.1fs" % (rows, time.time() - started))
+
+        before = _time_queries(cr, repeat)
+
+        for _name, expressions, _required in COMPLAINT_INDEXES:
+            cr.execute("CREATE INDEX ON %s (%s)" % (TABLE, ", ".join(expressions)))
+        cr.execute("ANALYZE %s" % TABLE)
+
+        after = _time_queries(cr, repeat)
+    finally:
+        cr.execute("ROLLBACK TO SAVEPOINT complaint_index_bench")
+
+    report = []
+    print("%-52s %12s %12s  %s" % ("query", "before (ms)", "after (ms)", "plan before -> after"))
+    for label, _query in QUERIES:
+        b_ms, b_plan = before[label]
+        a_ms, a_plan = after[label]
+        report.append({
+            "query": label,
+            "before_ms": b_ms,
+            "after_ms": a_ms,
+            "plan_before": b_plan,
+            "plan_after": a_plan,
+        })
+        print("%-52s %12.2f %12.2f  %s -> %s" % (label, b_ms, a_ms, b_plan, a_plan))
+    return report
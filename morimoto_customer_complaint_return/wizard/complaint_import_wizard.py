@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import datetime
+import io
+import logging
+import threading
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Header fail (huruf kecil) -> key dalaman. Column lain diabaikan.
+IMPORT_COLUMNS = {
+    "reference": "reference",
+    "order id": "reference",
+    "complaint id": "reference",
+    "date": "date",
+    "customer": "customer",
+    "customer name": "customer",
+    "phone": "phone",
+    "email": "email",
+    "sale order": "sale_order",
+    "delivery order": "delivery_order",
+    "complaint type": "complaint_type",
+    "description": "description",
+    "product": "product",
+    "sku": "product",
+    "quantity": "quantity",
+    "qty": "quantity",
+    "reason": "reason",
+}
+
+
+class CustomerComplaintImportWizard(models.TransientModel):
+    _name = "customer.complaint.import.wizard"
+    _description = "Import Marketplace Complaints"
+
+    file = fields.Binary(string="File", required=True)
+    filename = fields.Char(string="File Name")
+    channel = fields.Selection(
+        selection=lambda self: self.env["customer.complaint"]._fields["channel"].selection,
+        string="Channel",
+        required=True,
+        default="shopee",
+    )
+    chunk_size = fields.Integer(
+        string="Complaints per Commit",
+        default=500,
+        help="Complaints are created and committed in chunks of this size.",
+    )
+
+    state = fields.Selection(
+        [("draft", "Draft"), ("done", "Done")],
+        default="draft",
+    )
+    created_count = fields.Integer(string="Complaints Created", readonly=True)
+    error_count = fields.Integer(string="Rows with Errors", readonly=True)
+    error_file = fields.Binary(string="Error Report", readonly=True)
+    error_filename = fields.Char(string="Error File Name", readonly=True)
+
+    # -----------------------------------
+    # FILE STREAMING
+    # -----------------------------------
+    def _open_file(self):
+        """Buka fail upload sebagai stream (terus dari filestore kalau boleh)."""
+        attachment = self.env["ir.attachment"].sudo().search([
+            ("res_model", "=", self._name),
+            ("res_field", "=", "file"),
+            ("res_id", "=", self.id),
+        ], limit=1)
+        if attachment and attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), "rb")
+        return io.BytesIO(base64.b64decode(self.file))
+
+    def _iter_rows(self):
+        """Yield (row_number, dict) satu baris pada satu masa (CSV / XLSX)."""
+        is_xlsx = (self.filename or "").lower().endswith((".xlsx", ".xlsm"))
+        with self._open_file() as stream:
+            if is_xlsx:
+                import openpyxl
+
+                workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+                try:
+                    rows = workbook.active.iter_rows(values_only=True)
+                    header = next(rows, None)
+                    yield from self._map_rows(header, rows)
+                finally:
+                    workbook.close()
+            else:
+                text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+                rows = csv.reader(text)
+                header = next(rows, None)
+                yield from self._map_rows(header, rows)
+
+    def _map_rows(self, header, rows):
+        if not header:
+            raise UserError(_("The file is empty."))
+        keys = [IMPORT_COLUMNS.get(str(h or "").strip().lower()) for h in header]
+        if "reference" not in keys or "description" not in keys:
+            raise UserError(_(
+                "The file must contain at least a 'Reference' (or 'Order ID') and a 'Description' column."
+            ))
+        for row_number, values in enumerate(rows, start=2):
+            row = {}
+            for key, value in zip(keys, values):
+                if key:
+                    value = self._cell_value(value)
+                    if value not in (None, ""):
+                        row[key] = value
+            if row:
+                yield row_number, row
+
+    @api.model
+    def _cell_value(self, value):
+        """Cell -> str (tarikh dikekalkan). Lookup map semua guna key string,
+        jadi nombor XLSX (phone, reference) mesti jadi "60123..." bukan 60123.0."""
+        if value is None or isinstance(value, (datetime.date, datetime.datetime)):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value).strip()
+
+    def _iter_groups(self):
+        """Gabung baris berturutan dengan reference sama -> satu complaint."""
+        group = []
+        for row_number, row in self._iter_rows():
+            if group and row.get("reference") != group[0][1].get("reference"):
+                yield group
+                group = []
+            group.append((row_number, row))
+        if group:
+            yield group
+
+    # -----------------------------------
+    # LOOKUP MAPS (satu query per jenis, per chunk)
+    # -----------------------------------
+    def _build_lookup_maps(self, groups):
+        rows = [row for group in groups for _n, row in group]
+        refs = {r["reference"] for r in rows if r.get("reference")}
+        so_names = {r["sale_order"] for r in rows if r.get("sale_order")}
+        do_names = {r["delivery_order"] for r in rows if r.get("delivery_order")}
+        phones = {r["phone"] for r in rows if r.get("phone")}
+        emails = {r["email"].lower() for r in rows if r.get("email")}
+        products = {r["product"] for r in rows if r.get("product")}
+
+        maps = {"existing_refs": set(), "orders": {}, "pickings": {}, "partners": {}, "products": {}}
+        if refs:
+            maps["existing_refs"] = set(self.env["customer.complaint"].search([
+                ("external_ref", "in", list(refs)),
+                ("channel", "=", self.channel),
+            ]).mapped("external_ref"))
+        if so_names:
+            for order in self.env["sale.order"].search_read(
+                ["|", ("name", "in", list(so_names)), ("client_order_ref", "in", list(so_names))],
+                ["name", "client_order_ref", "partner_id"],
+            ):
+                for key in (order["name"], order["client_order_ref"]):
+                    if key:
+                        maps["orders"][key] = (order["id"], order["partner_id"][0])
+        if do_names:
+            for picking in self.env["stock.picking"].search_read(
+                [("name", "in", list(do_names))], ["name", "partner_id"]
+            ):
+                maps["pickings"][picking["name"]] = (
+                    picking["id"], picking["partner_id"] and picking["partner_id"][0]
+                )
+        if phones or emails:
+            domain = []
+            if phones:
+                domain = ["|", ("phone", "in", list(phones)), ("mobile", "in", list(phones))]
+            if emails:
+                email_domain = [("email", "in", list(emails))]
+                domain = ["|"] + domain + email_domain if domain else email_domain
+            for partner in self.env["res.partner"].search_read(domain, ["phone", "mobile", "email"]):
+                for key in (partner["phone"], partner["mobile"], (partner["email"] or "").lower()):
+                    if key:
+                        maps["partners"].setdefault(key, partner["id"])
+        if products:
+            for product in self.env["product.product"].search_read(
+                ["|", ("default_code", "in", list(products)), ("barcode", "in", list(products))],
+                ["default_code", "barcode"],
+            ):
+                for key in (product["default_code"], product["barcode"]):
+                    if key:
+                        maps["products"].setdefault(key, product["id"])
+        return maps
+
+    @api.model
+    def _selection_lookup(self, model_name, field_name):
+        """Terima code atau label (huruf kecil) -> code."""
+        selection = self.env[model_name]._fields[field_name]._description_selection(self.env)
+        lookup = {}
+        for value, label in selection:
+            lookup[value.lower()] = value
+            lookup[str(label).lower()] = value
+        return lookup
+
+    # -----------------------------------
+    # CHUNK PROCESSING
+    # -----------------------------------
+    def _prepare_complaint_vals(self, group, maps, type_lookup, reason_lookup, seen_refs):
+        """Return (vals, partner_key, error) untuk satu kumpulan baris (satu complaint).
+
+        ``partner_key`` = (name, phone, email) bila customer perlu dicipta; partner
+        hanya dicipta selepas seluruh kumpulan lulus semakan.
+        """
+        first = group[0][1]
+        ref = first.get("reference")
+        if not ref:
+            return None, None, _("Missing reference.")
+        if ref in seen_refs:
+            return None, None, _(
+                "Reference %s appears again further down the file; rows of one complaint must be consecutive."
+            ) % ref
+        seen_refs.add(ref)
+        if ref in maps["existing_refs"]:
+            return None, None, _("Already imported (reference %s).") % ref
+
+        vals = {
+            "external_ref": ref,
+            "channel": self.channel,
+            "description": "\n".join(str(r["description"]) for _n, r in group if r.get("description")),
+        }
+        if first.get("date"):
+            try:
+                vals["date_reported"] = fields.Date.to_date(str(first["date"])[:10])
+            except ValueError:
+                return None, None, _("Invalid date: %s") % first["date"]
+        if first.get("complaint_type"):
+            ctype = type_lookup.get(first["complaint_type"].lower())
+            if not ctype:
+                return None, None, _("Unknown complaint type: %s") % first["complaint_type"]
+            vals["complaint_type"] = ctype
+
+        partner_id = partner_key = False
+        if first.get("sale_order"):
+            order = maps["orders"].get(first["sale_order"])
+            if not order:
+                return None, None, _("Sales order not found: %s") % first["sale_order"]
+            vals["sale_order_id"], partner_id = order
+        if first.get("delivery_order"):
+            picking = maps["pickings"].get(first["delivery_order"])
+            if not picking:
+                return None, None, _("Delivery order not found: %s") % first["delivery_order"]
+            vals["picking_id"] = picking[0]
+            partner_id = partner_id or picking[1]
+        if not partner_id:
+            partner_id = maps["partners"].get(first.get("phone")) or maps["partners"].get(
+                (first.get("email") or "").lower()
+            )
+        if not partner_id:
+            if not first.get("customer"):
+                return None, None, _("Customer not found and no customer name given.")
+            # Customer baru: dicipta sekali gus untuk semua complaint dalam chunk
+            partner_key = (first["customer"], first.get("phone"), first.get("email"))
+        else:
+            vals["partner_id"] = partner_id
+
+        lines = []
+        for row_number, row in group:
+            if not row.get("product"):
+                continue
+            product_id = maps["products"].get(row["product"])
+            if not product_id:
+                return None, None, _("Product not found on row %s: %s") % (row_number, row["product"])
+            try:
+                qty = float(row.get("quantity") or 0.0)
+            except (TypeError, ValueError):
+                return None, None, _("Invalid quantity on row %s: %s") % (row_number, row["quantity"])
+            line_vals = {"product_id": product_id, "quantity_returned": qty}
+            if row.get("reason"):
+                line_vals["reason"] = reason_lookup.get(row["reason"].lower(), "other")
+            lines.append((0, 0, line_vals))
+        if lines:
+            vals["is_return_involved"] = True
+            vals["return_line_ids"] = lines
+        return vals, partner_key, None
+
+    def _process_chunk(self, groups, type_lookup, reason_lookup, errors, seen_refs):
+        maps = self._build_lookup_maps(groups)
+        entries = []
+        for group in groups:
+            vals, partner_key, error = self._prepare_complaint_vals(
+                group, maps, type_lookup, reason_lookup, seen_refs
+            )
+            if error:
+                self._add_group_error(errors, group, error)
+                continue
+            entries.append((group, vals, partner_key))
+        if not entries:
+            return 0
+
+        # Satu savepoint per chunk; kalau DB tolak, ulang satu-satu supaya
+        # hanya complaint yang gagal masuk error report
+        try:
+            with self.env.cr.savepoint():
+                self._create_complaints(entries)
+            return len(entries)
+        except Exception:
+            _logger.warning("Complaint import: chunk create failed, retrying per complaint", exc_info=True)
+
+        created = 0
+        for entry in entries:
+            try:
+                with self.env.cr.savepoint():
+                    self._create_complaints([entry])
+                created += 1
+            except Exception as e:
+                self._add_group_error(errors, entry[0], str(e))
+        return created
+
+    def _create_complaints(self, entries):
+        """Create customer baru (sekali gus) dan complaint untuk ``entries``."""
+        keys = list(dict.fromkeys(key for _group, _vals, key in entries if key))
+        partner_ids = {}
+        if keys:
+            partners = self.env["res.partner"].create([
+                {"name": name, "phone": phone or False, "email": email or False, "customer_rank": 1}
+                for name, phone, email in keys
+            ])
+            partner_ids = dict(zip(keys, partners.ids))
+        vals_list = []
+        for _group, vals, key in entries:
+            vals = dict(vals)
+            if key:
+                vals["partner_id"] = partner_ids[key]
+            vals_list.append(vals)
+        return self.env["customer.complaint"].create(vals_list)
+
+    def _add_group_error(self, errors, group, error):
+        for row_number, row in group:
+            errors.append((row_number, row.get("reference") or "", error))
+
+    # -----------------------------------
+    # MAIN BUTTON
+    # -----------------------------------
+    def action_import(self):
+        """Stream fail, create complaint ikut chunk dan commit setiap chunk."""
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        chunk_size = max(self.chunk_size, 1)
+        type_lookup = self._selection_lookup("customer.complaint", "complaint_type")
+        reason_lookup = self._selection_lookup("customer.complaint.line", "reason")
+
+        created = 0
+        errors = []
+        seen_refs = set()
+        chunk = []
+        for group in self._iter_groups():
+            chunk.append(group)
+            if len(chunk) >= chunk_size:
+                created += self._process_chunk(chunk, type_lookup, reason_lookup, errors, seen_refs)
+                chunk = []
+                if auto_commit:
+                    self.env.cr.commit()
+                self.env.invalidate_all()
+        if chunk:
+            created += self._process_chunk(chunk, type_lookup, reason_lookup, errors, seen_refs)
+
+        vals = {"state": "done", "created_count": created, "error_count": len(errors)}
+        if errors:
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(["Row", "Reference", "Error"])
+            writer.writerows(errors)
+            vals.update({
+                "error_file": base64.b64encode(output.getvalue().encode("utf-8")),
+                "error_filename": "complaint_import_errors.csv",
+            })
+        self.write(vals)
+        _logger.info("Complaint import: %s created, %s rows with errors", created, len(errors))
+
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }